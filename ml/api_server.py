@@ -1,8 +1,12 @@
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, request, jsonify, send_from_directory, g
 from flask_cors import CORS
 from stable_baselines3 import DQN
 import numpy as np
 import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
 from pathlib import Path
 import sys
 import torch
@@ -34,8 +38,12 @@ else:
     print(f"⚠️ RL model not found: {model_path}")
     model = None
 
-# Load form classification model
-form_model_path = './models/form_classifier/form_classifier_rf.pkl'
+# Load form classification model (HGB is the training default; RF for older models)
+form_model_candidates = [
+    './models/form_classifier/form_classifier_hgb.pkl',
+    './models/form_classifier/form_classifier_rf.pkl'
+]
+form_model_path = next((p for p in form_model_candidates if os.path.exists(p)), form_model_candidates[-1])
 if os.path.exists(form_model_path):
     form_classifier = FormFeedbackGenerator(form_model_path)
     print(f"✅ Loaded form classifier: {form_model_path}")
@@ -43,6 +51,63 @@ else:
     print(f"⚠️ Form classifier not found: {form_model_path}")
     form_classifier = None
 
+
+class FormBatcher:
+    """
+    Micro-batches concurrent /predict_form requests
+    
+    Request threads enqueue their features and block on a Future; a single
+    worker thread waits up to max_wait_s for more requests to arrive, then
+    scores the whole batch with one model call.
+    """
+    
+    def __init__(self, generator: FormFeedbackGenerator, max_batch: int = 64, max_wait_s: float = 0.005):
+        self.generator = generator
+        self.max_batch = max_batch
+        self.max_wait_s = max_wait_s
+        self.requests = queue.Queue()
+        threading.Thread(target=self._run, name='form-batcher', daemon=True).start()
+    
+    def analyze_form(self, features: np.ndarray, exercise_type: str):
+        """Same result as FormFeedbackGenerator.analyze_form, scored in a batch"""
+        future = Future()
+        self.requests.put((features, exercise_type, future))
+        return future.result()
+    
+    def _run(self):
+        while True:
+            batch = [self.requests.get()]
+            deadline = time.perf_counter() + self.max_wait_s
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.perf_counter()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self.requests.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            self._score(batch)
+    
+    def _score(self, batch):
+        try:
+            features = np.stack([item[0] for item in batch])
+            results = self.generator.analyze_form_batch(features, [item[1] for item in batch])
+        except Exception:
+            # e.g. a request with the wrong feature count - score one at a
+            # time so each request gets its own result or error
+            for features, exercise_type, future in batch:
+                try:
+                    future.set_result(self.generator.analyze_form(features, exercise_type))
+                except Exception as e:
+                    future.set_exception(e)
+            return
+        
+        for (_, _, future), result in zip(batch, results):
+            future.set_result(result)
+
+
+form_batcher = FormBatcher(form_classifier) if form_classifier is not None else None
+
 # ============================================================
 # LSTM MOVEMENT QUALITY MODEL (NEW)
 # ============================================================
@@ -99,6 +164,19 @@ else:
     print(f"⚠️ LSTM model not found: {lstm_model_path}")
     print("   Train the model first with: python train_lstm.py")
 
+@app.before_request
+def start_timer():
+    """Record when request handling started"""
+    g.start_time = time.perf_counter()
+
+@app.after_request
+def add_elapsed_header(response):
+    """Report server-side handling time so clients can separate it from network cost"""
+    start_time = getattr(g, 'start_time', None)
+    if start_time is not None:
+        response.headers['X-Elapsed-Ms'] = f"{(time.perf_counter() - start_time) * 1000:.3f}"
+    return response
+
 @app.route('/')
 def serve_demo():
     """Serve the main demo page"""
@@ -120,7 +198,7 @@ def health():
         'models': {
             'rl': 'DQN_rehab_final.zip' if model else None,
             'lstm': 'shoulder_lstm_model.pt' if lstm_model else None,
-            'form': 'form_classifier_rf.pkl' if form_classifier else None
+            'form': os.path.basename(form_model_path) if form_classifier else None
         }
     })
 
@@ -182,8 +260,8 @@ def predict_form():
         if len(features) == 0:
             return jsonify({'error': 'No features provided'}), 400
         
-        # Analyze form
-        result = form_classifier.analyze_form(features, exercise_type)
+        # Analyze form (batched with any concurrent requests)
+        result = form_batcher.analyze_form(features, exercise_type)
         
         return jsonify(result)
     
@@ -16,6 +16,8 @@ Folder location is the source of truth for labels, not filename suffix.
 """
 
 import os
+import hashlib
+import json
 import numpy as np
 import torch
 from torch.utils.data import Dataset
@@ -58,6 +60,9 @@ DATA_ROOT = ML_DIR / "data" / "UI-PRMD"
 CORRECT_SEG_ROOT = DATA_ROOT / "Segmented Movements" / "Kinect" / "Angles"
 INCORRECT_SEG_ROOT = DATA_ROOT / "Incorrect Segmented Movements" / "Kinect" / "Angles"
 
+# Preprocessed (resampled + normalized) datasets are cached here
+CACHE_DIR = ML_DIR / "data" / "cache"
+
 # Alternative: If your dataset has column names, uncomment and adjust:
 # ANGLE_COLUMN_NAMES = [
 #     'SpineBase_x', 'SpineBase_y', 'SpineBase_z',
@@ -198,7 +203,8 @@ class ShoulderRehabDataset(Dataset):
                  movements: List[str] = TARGET_MOVEMENTS,
                  seq_len: int = SEQ_LEN,
                  column_indices: List[int] = ANGLE_COLUMN_INDICES,
-                 normalize: bool = True):
+                 normalize: bool = True,
+                 cache_dir: str = None):
         """
         Args:
           data_root: Path to UI-PRMD base directory (contains 'Segmented Movements' and 'Incorrect Segmented Movements')
@@ -207,6 +213,8 @@ class ShoulderRehabDataset(Dataset):
           seq_len: Target sequence length for LSTM
           column_indices: Which angle columns to use
           normalize: Whether to apply z-score normalization
+          cache_dir: If set, reuse/save the preprocessed dataset as a .pt file here,
+                    keyed by the settings above and the source files' mtimes
         """
         # Set paths for correct and incorrect reps
         if data_root is None:
@@ -234,12 +242,65 @@ class ShoulderRehabDataset(Dataset):
         self.angle_std = None
         self.global_max_rom = 0.0
         
+        cache_path = None
+        if cache_dir is not None:
+            cache_path = Path(cache_dir) / f"ui_prmd_{self._cache_key()}.pt"
+            if cache_path.exists():
+                self._load_cache(cache_path)
+                return
+        
         # Load all data
         self._load_dataset()
         
         # Compute normalization statistics
         if self.normalize:
             self._compute_normalization()
+        
+        if cache_path is not None:
+            self._save_cache(cache_path)
+    
+    def _cache_key(self) -> str:
+        """Hash of the loader settings and every source file's name, size and mtime."""
+        h = hashlib.sha1(json.dumps(
+            [self.movements, self.seq_len, self.column_indices, self.normalize]
+        ).encode())
+        for root in (self.correct_root, self.incorrect_root):
+            for filepath in sorted(root.glob('*.txt')):
+                stat = filepath.stat()
+                h.update(f"{root.name}/{filepath.name}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+        return h.hexdigest()[:16]
+    
+    def _save_cache(self, cache_path: Path):
+        """Save the preprocessed dataset as plain tensors/lists."""
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        torch.save({
+            'sequences': torch.from_numpy(np.stack(self.sequences, axis=0)),
+            'labels': self.labels,
+            'roms': self.roms,
+            'movement_ids': self.movement_ids,
+            'metadata': self.metadata,
+            'angle_mean': None if self.angle_mean is None else torch.from_numpy(self.angle_mean),
+            'angle_std': None if self.angle_std is None else torch.from_numpy(self.angle_std),
+            'global_max_rom': self.global_max_rom
+        }, cache_path)
+        print(f"Dataset cached to: {cache_path}")
+    
+    def _load_cache(self, cache_path: Path):
+        """Restore a dataset saved by _save_cache."""
+        try:
+            cache = torch.load(cache_path, map_location='cpu', mmap=True, weights_only=True)
+        except TypeError:  # PyTorch < 2.1 has no mmap/weights_only
+            cache = torch.load(cache_path, map_location='cpu')
+        
+        self.sequences = list(cache['sequences'].numpy())
+        self.labels = cache['labels']
+        self.roms = cache['roms']
+        self.movement_ids = cache['movement_ids']
+        self.metadata = cache['metadata']
+        self.angle_mean = None if cache['angle_mean'] is None else cache['angle_mean'].numpy()
+        self.angle_std = None if cache['angle_std'] is None else cache['angle_std'].numpy()
+        self.global_max_rom = cache['global_max_rom']
+        print(f"Loaded {len(self.sequences)} cached reps from: {cache_path}")
     
     def _load_dataset(self):
         """Scan both correct and incorrect directories and load all matching files."""
@@ -8,11 +8,11 @@ The RL agent learns to:
 4. Maximize user performance while preventing fatigue
 """
 
+import copy
 import gymnasium as gym
 from gymnasium import spaces
 import numpy as np
 from typing import Dict, Tuple, Optional
-import pandas as pd
 
 
 class RehabExerciseEnv(gym.Env):
@@ -48,10 +48,10 @@ class RehabExerciseEnv(gym.Env):
     
     metadata = {'render.modes': ['human']}
     
-    def __init__(self, user_data: Optional[pd.DataFrame] = None):
+    def __init__(self, user_data: Optional[Dict[str, np.ndarray]] = None):
         super(RehabExerciseEnv, self).__init__()
         
-        # Load user performance data (from dataset)
+        # User performance data (from dataset), one numpy array per column
         self.user_data = user_data
         
         # Action space: 5 discrete actions
@@ -88,6 +88,10 @@ class RehabExerciseEnv(gym.Env):
             dtype=np.float32
         )
         
+        # Cached state vector, rebuilt after each reset/step (see _get_state)
+        self._state_version = 0
+        self._state_cache = None
+        
         # Environment state
         self.reset()
     
@@ -102,12 +106,12 @@ class RehabExerciseEnv(gym.Env):
             observation: Initial state
             info: Additional information
         """
-        # Set seed for reproducibility
-        if seed is not None:
-            np.random.seed(seed)
+        # Seed this env's own generator (self.np_random); the global
+        # np.random state is left alone
+        super(RehabExerciseEnv, self).reset(seed=seed)
         
         # Initialize user profile (random or from dataset)
-        self.user_baseline = np.random.uniform(80, 110)  # Baseline ability
+        self.user_baseline = self.np_random.uniform(80, 110)  # Baseline ability
         self.current_target = self.user_baseline + 5  # Start slightly challenging
         
         # Session state
@@ -124,29 +128,68 @@ class RehabExerciseEnv(gym.Env):
         self.session_quality = []
         self.personal_best = self.user_baseline
         
+        self._invalidate_state()
         return self._get_state(), {}
     
+    # Per-episode attributes set by reset(); captured by _snapshot()
+    _EPISODE_ATTRS = (
+        'user_baseline', 'current_target', 'rep_history', 'reps_completed',
+        'session_duration', 'fatigue', 'consecutive_successes',
+        'consecutive_failures', 'rest_timer', 'streak_days',
+        'session_quality', 'personal_best'
+    )
+    
+    def _snapshot(self) -> Dict:
+        """Capture per-episode state so it can be restored without reset()"""
+        # Shallow copies keep later appends to the histories out of the snapshot
+        return {name: copy.copy(getattr(self, name)) for name in self._EPISODE_ATTRS}
+    
+    def _restore(self, snapshot: Dict):
+        """Restore per-episode state captured by _snapshot()"""
+        for name, value in snapshot.items():
+            setattr(self, name, copy.copy(value))
+        self._invalidate_state()
+    
+    def _invalidate_state(self):
+        """Mark the cached state vector stale after the episode state changed
+        
+        Called by reset(), _restore() and every step; code that edits episode
+        attributes directly must call it before reading the state again.
+        """
+        self._state_version += 1
+        self._state_cache = None
+    
     def _get_state(self) -> np.ndarray:
+        """Current state vector, rebuilt only after the episode state changes
+        
+        The returned array is the cache itself, marked read-only so an
+        in-place edit can't leak into later calls; copy it to modify.
+        """
+        if self._state_cache is None:
+            state = self._compute_state()
+            state.flags.writeable = False
+            self._state_cache = state
+        return self._state_cache
+    
+    def _compute_state(self) -> np.ndarray:
         """Construct current state vector"""
-        # Last 10 rep angles (pad with zeros if < 10)
-        last_10_reps = self.rep_history[-10:] if self.rep_history else []
-        last_10_reps = last_10_reps + [0] * (10 - len(last_10_reps))
+        # rep_history may be a list or an ndarray; asarray is free for the latter
+        recent = np.asarray(self.rep_history[-10:])
+        n_reps = len(self.rep_history)
         
-        # Normalize angles to 0-180
-        last_10_reps = np.array(last_10_reps) / 180.0
+        # Last 10 rep angles (pad with zeros if < 10), normalized to 0-180
+        last_10_reps = np.zeros(10)
+        last_10_reps[:len(recent)] = recent / 180.0
         
         # Consistency score (std dev of last 10 reps)
-        if len(self.rep_history) >= 3:
-            consistency = 1.0 - min(np.std(self.rep_history[-10:]) / 30.0, 1.0)
+        if n_reps >= 3:
+            consistency = 1.0 - min(np.std(recent) / 30.0, 1.0)
         else:
             consistency = 0.5
         
         # Success rate
-        if len(self.rep_history) >= 1:
-            recent_success = np.mean([
-                1.0 if abs(angle - self.current_target) <= 10 else 0.0
-                for angle in self.rep_history[-10:]
-            ])
+        if n_reps >= 1:
+            recent_success = np.mean(np.abs(recent - self.current_target) <= 10)
         else:
             recent_success = 0.5
         
@@ -179,6 +222,38 @@ class RehabExerciseEnv(gym.Env):
         Returns:
             state, reward, terminated, truncated, info
         """
+        reward, terminated, truncated, info = self._advance(action)
+        return self._get_state(), reward, terminated, truncated, info
+    
+    def step_many(self, action: int, max_steps: int) -> Tuple[int, np.ndarray, Dict]:
+        """
+        Repeat one action until the episode ends or max_steps is reached
+        
+        Equivalent to calling step() in a loop, but the state vector is only
+        built once at the end instead of after every step.
+        
+        Args:
+            action: Action to apply at every step
+            max_steps: Upper bound on the number of steps taken
+            
+        Returns:
+            steps taken, final state, info from the last step
+        """
+        steps = 0
+        info = {}
+        
+        while steps < max_steps:
+            _, terminated, truncated, info = self._advance(action)
+            steps += 1
+            if terminated or truncated:
+                break
+        
+        return steps, self._get_state(), info
+    
+    def _advance(self, action: int) -> Tuple[float, bool, bool, Dict]:
+        """Apply one step of environment dynamics without building the state"""
+        self._invalidate_state()
+        
         reward = 0
         terminated = False
         truncated = False
@@ -231,14 +306,11 @@ class RehabExerciseEnv(gym.Env):
         # Update session duration
         self.session_duration += 10
         
-        # Get next state
-        state = self._get_state()
-        
         info['current_target'] = self.current_target
         info['fatigue'] = self.fatigue
         info['consecutive_successes'] = self.consecutive_successes
         
-        return state, reward, terminated, truncated, info
+        return reward, terminated, truncated, info
     
     def _apply_action(self, action: int) -> str:
         """Apply RL agent's action"""
@@ -268,7 +340,7 @@ class RehabExerciseEnv(gym.Env):
             quality: Form quality score (0-1)
         """
         # Base ability with noise
-        noise = np.random.normal(0, 5)
+        noise = self.np_random.normal(0, 5)
         
         # Fatigue affects performance
         fatigue_penalty = self.fatigue * 10
@@ -357,7 +429,7 @@ class RehabExerciseEnv(gym.Env):
             print(f"Fatigue: {self.fatigue:.2f}")
             print(f"Consecutive Successes: {self.consecutive_successes}")
             
-            if self.rep_history:
+            if len(self.rep_history):
                 print(f"Last Rep: {self.rep_history[-1]:.1f}°")
                 print(f"Average Quality: {np.mean(self.session_quality):.2f}")
             
@@ -10,6 +10,33 @@ import joblib
 from pathlib import Path
 from typing import Dict, List
 
+try:
+    import onnxruntime as ort
+except ImportError:
+    ort = None
+
+
+def load_onnx_session(model_path: str, n_features: int):
+    """
+    ONNX Runtime session for the .onnx exported next to a form-classifier pickle
+    
+    Returns None when onnxruntime or the export is missing, or when the
+    export's input width doesn't match the pickle's feature count.
+    """
+    onnx_path = Path(model_path).with_suffix('.onnx')
+    if ort is None or not onnx_path.exists():
+        return None
+    
+    session = ort.InferenceSession(str(onnx_path), providers=['CPUExecutionProvider'])
+    n_inputs = session.get_inputs()[0].shape[1]
+    if n_inputs != n_features:
+        print(f"⚠️  Ignoring {onnx_path}: expects {n_inputs} features, model has {n_features}")
+        return None
+    
+    print(f"✅ ONNX Runtime session: {onnx_path}")
+    return session
+
+
 class FormFeedbackGenerator:
     """Generate specific form corrections based on sensor data"""
     
@@ -105,6 +132,7 @@ class FormFeedbackGenerator:
         self.model = None
         self.feature_names = None
         self.model_type = None
+        self.onnx_session = None
         
         if model_path:
             self.load_model(model_path)
@@ -116,6 +144,8 @@ class FormFeedbackGenerator:
         self.feature_names = model_data['feature_names']
         self.model_type = model_data['model_type']
         print(f"✅ Form classifier loaded from: {model_path}")
+        
+        self.onnx_session = load_onnx_session(model_path, len(self.feature_names))
     
     def analyze_form(self, features: np.ndarray, exercise_type: str) -> Dict:
         """
@@ -140,10 +170,37 @@ class FormFeedbackGenerator:
         if len(features.shape) == 1:
             features = features.reshape(1, -1)
         
-        # Predict
-        prediction = self.model.predict(features)[0]
-        probabilities = self.model.predict_proba(features)[0]
+        return self.analyze_form_batch(features, [exercise_type])[0]
+    
+    def analyze_form_batch(self, features: np.ndarray, exercise_types: List[str]) -> List[Dict]:
+        """
+        Analyze several samples with a single model call
         
+        Scores through ONNX Runtime when the model has a matching .onnx
+        export, scikit-learn otherwise.
+        
+        Args:
+            features: Array of shape (n_samples, n_features)
+            exercise_types: Exercise name for each row
+        
+        Returns:
+            list of analyze_form dicts, one per row
+        """
+        if self.onnx_session is not None:
+            X = np.ascontiguousarray(features, dtype=np.float32)
+            predictions, probabilities = self.onnx_session.run(None, {'X': X})
+        else:
+            probabilities = self.model.predict_proba(features)
+            predictions = self.model.classes_[probabilities.argmax(axis=1)]
+        
+        return [
+            self._build_feedback(features[i:i + 1], exercise_types[i], predictions[i], probabilities[i])
+            for i in range(len(features))
+        ]
+    
+    def _build_feedback(self, features: np.ndarray, exercise_type: str,
+                        prediction, probabilities: np.ndarray) -> Dict:
+        """Turn one sample's prediction into the feedback dict"""
         correct_prob = probabilities[1]
         is_correct = prediction == 1
         
@@ -0,0 +1,42 @@
+"""
+Latency recording for the API test clients
+Wrap each request in timed(name) and print a summary at the end of a run
+"""
+
+import contextlib
+import time
+
+# (name, nanoseconds) for every timed request in this process
+LAT = []
+
+
+@contextlib.contextmanager
+def timed(name: str):
+    """Record wall-clock latency of the wrapped block under `name`"""
+    t0 = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        LAT.append((name, time.perf_counter_ns() - t0))
+
+
+def percentile(samples_ns, pct: float) -> float:
+    """Nearest-rank percentile of a list of nanosecond samples, in ms"""
+    ordered = sorted(samples_ns)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[rank] / 1e6
+
+
+def print_latency_summary():
+    """Print p50/p95/p99 and the slowest request recorded so far"""
+    if not LAT:
+        return
+
+    samples = [dt for _, dt in LAT]
+    slowest_name, slowest_ns = max(LAT, key=lambda item: item[1])
+
+    print(f"\n⏱️  Request latency (n={len(samples)})")
+    print(f"   p50: {percentile(samples, 50):.2f} ms")
+    print(f"   p95: {percentile(samples, 95):.2f} ms")
+    print(f"   p99: {percentile(samples, 99):.2f} ms")
+    print(f"   Slowest: {slowest_name} ({slowest_ns / 1e6:.2f} ms)")
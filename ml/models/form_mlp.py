@@ -0,0 +1,166 @@
+"""
+PyTorch MLP for Form Classification
+
+Same 128 → 64 → 32 architecture as the scikit-learn MLPClassifier option in
+train_form_classifier.py, but trained with PyTorch so the GEMMs run on
+MKL/oneDNN (CPU) or tensor cores in bfloat16 (CUDA).
+
+TorchMLPClassifier follows the scikit-learn estimator API (fit / predict /
+predict_proba / score), so it drops into FormClassifier's training,
+cross-validation and joblib save/load unchanged.
+"""
+
+import copy
+
+import numpy as np
+import torch
+import torch.nn as nn
+from sklearn.base import BaseEstimator, ClassifierMixin
+
+
+class TorchMLP(nn.Sequential):
+    """
+    Linear → ReLU → Dropout stacks followed by a single-logit output layer.
+    """
+
+    def __init__(self, input_size: int, hidden_layer_sizes=(128, 64, 32), dropout: float = 0.1):
+        layers = []
+        in_features = input_size
+        for hidden in hidden_layer_sizes:
+            layers += [nn.Linear(in_features, hidden), nn.ReLU(), nn.Dropout(dropout)]
+            in_features = hidden
+        layers.append(nn.Linear(in_features, 1))
+
+        super(TorchMLP, self).__init__(*layers)
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        """
+        Args:
+          x: [batch, input_size] tensor of features
+
+        Returns:
+          logits: [batch] tensor of raw logits (before sigmoid)
+        """
+        return super(TorchMLP, self).forward(x).squeeze(1)
+
+
+class TorchMLPClassifier(BaseEstimator, ClassifierMixin):
+    """
+    Binary classifier wrapping TorchMLP in the scikit-learn estimator API.
+
+    Trains with Adam + BCEWithLogitsLoss and stops early when the loss on a
+    held-out fraction of the training data stops improving. Pickles as a
+    state_dict, so saved models load on machines without a GPU.
+    """
+
+    def __init__(self,
+                 hidden_layer_sizes=(128, 64, 32),
+                 dropout: float = 0.1,
+                 learning_rate: float = 1e-3,
+                 batch_size: int = 256,
+                 max_epochs: int = 200,
+                 patience: int = 10,
+                 validation_fraction: float = 0.1,
+                 random_state: int = 42):
+        self.hidden_layer_sizes = hidden_layer_sizes
+        self.dropout = dropout
+        self.learning_rate = learning_rate
+        self.batch_size = batch_size
+        self.max_epochs = max_epochs
+        self.patience = patience
+        self.validation_fraction = validation_fraction
+        self.random_state = random_state
+
+    def fit(self, X, y):
+        """Train on X [N, F] and binary labels y [N]."""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        y = np.asarray(y)
+        self.classes_ = np.unique(y)
+        self.n_features_in_ = X.shape[1]
+
+        device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+        use_bf16 = device.type == 'cuda' and torch.cuda.is_bf16_supported()
+        torch.manual_seed(self.random_state)
+
+        # Hold out part of the training data for early stopping
+        rng = np.random.default_rng(self.random_state)
+        order = rng.permutation(len(X))
+        n_val = max(1, int(len(X) * self.validation_fraction))
+        val_idx, train_idx = order[:n_val], order[n_val:]
+
+        X_all = torch.from_numpy(X).to(device)
+        y_all = torch.from_numpy((y == self.classes_[-1]).astype(np.float32)).to(device)
+        train_idx = torch.from_numpy(train_idx).to(device)
+        val_idx = torch.from_numpy(val_idx).to(device)
+        X_val, y_val = X_all[val_idx], y_all[val_idx]
+
+        model = TorchMLP(self.n_features_in_, self.hidden_layer_sizes, self.dropout).to(device)
+        criterion = nn.BCEWithLogitsLoss()
+        optimizer = torch.optim.Adam(model.parameters(), lr=self.learning_rate)
+
+        best_loss = float('inf')
+        best_state = None
+        epochs_without_improvement = 0
+
+        for epoch in range(self.max_epochs):
+            model.train()
+            perm = train_idx[torch.randperm(len(train_idx), device=device)]
+            for i in range(0, len(perm), self.batch_size):
+                idx = perm[i:i + self.batch_size]
+                with torch.autocast(device_type=device.type, dtype=torch.bfloat16, enabled=use_bf16):
+                    logits = model(X_all[idx])
+                loss = criterion(logits.float(), y_all[idx])
+
+                optimizer.zero_grad(set_to_none=True)
+                loss.backward()
+                optimizer.step()
+
+            # Early stopping on held-out loss
+            model.eval()
+            with torch.inference_mode():
+                val_loss = criterion(model(X_val).float(), y_val).item()
+
+            if val_loss < best_loss:
+                best_loss = val_loss
+                best_state = copy.deepcopy(model.state_dict())
+                epochs_without_improvement = 0
+            else:
+                epochs_without_improvement += 1
+                if epochs_without_improvement >= self.patience:
+                    break
+
+        model.load_state_dict(best_state)
+        self.model_ = model.cpu().eval()
+        self.n_iter_ = epoch + 1
+        return self
+
+    def predict_proba(self, X) -> np.ndarray:
+        """Class probabilities [N, 2] in the order of classes_."""
+        X = torch.from_numpy(np.ascontiguousarray(X, dtype=np.float32))
+        with torch.inference_mode():
+            p = torch.sigmoid(self.model_(X)).numpy()
+        return np.stack([1.0 - p, p], axis=1)
+
+    def predict(self, X) -> np.ndarray:
+        """Predicted class labels [N]."""
+        # logits > 0 is sigmoid > 0.5 without the sigmoid
+        X = torch.from_numpy(np.ascontiguousarray(X, dtype=np.float32))
+        with torch.inference_mode():
+            positive = (self.model_(X) > 0).numpy()
+        return self.classes_[positive.astype(np.intp)]
+
+    def __getstate__(self):
+        # Store the network as a state_dict rather than a pickled nn.Module;
+        # copy first, since BaseEstimator may hand back the live __dict__
+        state = dict(super(TorchMLPClassifier, self).__getstate__())
+        if 'model_' in state:
+            state['model_'] = state['model_'].state_dict()
+        return state
+
+    def __setstate__(self, state):
+        model_state = state.pop('model_', None)
+        super(TorchMLPClassifier, self).__setstate__(state)
+        if model_state is not None:
+            self.model_ = TorchMLP(self.n_features_in_, self.hidden_layer_sizes, self.dropout)
+            self.model_.load_state_dict(model_state)
+            self.model_.eval()
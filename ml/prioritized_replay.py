@@ -0,0 +1,200 @@
+"""
+Prioritized Experience Replay for DQN
+
+Transitions are sampled in proportion to their TD error (Schaul et al., 2016)
+using a sum-tree, so sampling and priority updates are O(log N). Stable
+Baselines3 ships only uniform replay, so this provides:
+  - SumTree: array-backed binary tree of priorities
+  - PrioritizedReplayBuffer: drop-in FastReplayBuffer with prioritized sampling
+  - PrioritizedDQN: DQN whose train() applies importance-sampling weights
+    and writes the new TD errors back as priorities
+"""
+
+import numpy as np
+import torch as th
+import torch.nn.functional as F
+from stable_baselines3 import DQN
+from stable_baselines3.common.type_aliases import ReplayBufferSamples
+
+from replay_buffers import FastReplayBuffer
+
+
+class SumTree:
+    """Binary tree where every node holds the sum of its children's priorities"""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        # Internal nodes in [0, capacity - 1), leaves in [capacity - 1, 2 * capacity - 1)
+        self.tree = np.zeros(2 * capacity - 1, dtype=np.float64)
+
+    @property
+    def total(self) -> float:
+        return float(self.tree[0])
+
+    def update(self, data_idx: np.ndarray, priorities: np.ndarray):
+        """Set leaf priorities and recompute their ancestors"""
+        idx = np.asarray(data_idx) + self.capacity - 1
+        self.tree[idx] = priorities
+
+        # Walk all touched paths up together; a node's last recompute always
+        # comes after its children's, so uneven leaf depths are fine
+        idx = np.unique((idx - 1) // 2)
+        while idx.size:
+            self.tree[idx] = self.tree[2 * idx + 1] + self.tree[2 * idx + 2]
+            idx = np.unique((idx[idx > 0] - 1) // 2)
+
+    def find(self, values: np.ndarray) -> np.ndarray:
+        """Data index of the leaf each prefix-sum value falls into"""
+        values = np.array(values, dtype=np.float64)
+        idx = np.zeros(len(values), dtype=np.int64)
+
+        internal = idx < self.capacity - 1
+        while internal.any():
+            left = 2 * idx[internal] + 1
+            left_sum = self.tree[left]
+            v = values[internal]
+            go_left = v <= left_sum
+
+            idx[internal] = np.where(go_left, left, left + 1)
+            values[internal] = np.where(go_left, v, v - left_sum)
+            internal = idx < self.capacity - 1
+
+        return idx - (self.capacity - 1)
+
+
+class PrioritizedReplayBuffer(FastReplayBuffer):
+    """
+    Replay buffer sampling transitions with probability p_i^alpha / sum(p^alpha)
+
+    Every (position, env) slot of the underlying ReplayBuffer is one leaf of
+    the sum-tree. New transitions get the current max priority so they are
+    replayed at least once. beta (importance-sampling correction) is annealed
+    towards 1 by PrioritizedDQN.
+    """
+
+    def __init__(self,
+                 buffer_size: int,
+                 observation_space,
+                 action_space,
+                 device='auto',
+                 n_envs: int = 1,
+                 optimize_memory_usage: bool = False,
+                 handle_timeout_termination: bool = True,
+                 alpha: float = 0.6,
+                 beta: float = 0.4,
+                 eps: float = 1e-6):
+        if optimize_memory_usage:
+            raise ValueError("PrioritizedReplayBuffer does not support optimize_memory_usage")
+
+        super(PrioritizedReplayBuffer, self).__init__(
+            buffer_size, observation_space, action_space, device=device, n_envs=n_envs,
+            optimize_memory_usage=False, handle_timeout_termination=handle_timeout_termination
+        )
+
+        self.alpha = alpha
+        self.beta_start = beta
+        self.beta = beta
+        self.eps = eps
+        self.max_priority = 1.0
+        self.tree = SumTree(self.buffer_size * self.n_envs)
+
+    def add(self, *args, **kwargs) -> None:
+        pos = self.pos
+        super(PrioritizedReplayBuffer, self).add(*args, **kwargs)
+
+        data_idx = pos * self.n_envs + np.arange(self.n_envs)
+        self.tree.update(data_idx, np.full(self.n_envs, self.max_priority ** self.alpha))
+
+    def sample_prioritized(self, batch_size: int, env=None):
+        """
+        Stratified prioritized sample
+
+        Returns:
+            (ReplayBufferSamples, importance weights [batch, 1] tensor, data indices)
+        """
+        n_stored = (self.buffer_size if self.full else self.pos) * self.n_envs
+
+        # One uniform draw per equal-mass segment of the priority total
+        segment = self.tree.total / batch_size
+        values = (np.arange(batch_size) + np.random.uniform(size=batch_size)) * segment
+        data_idx = np.minimum(self.tree.find(values), n_stored - 1)
+
+        probs = self.tree.tree[data_idx + self.tree.capacity - 1] / self.tree.total
+        weights = (n_stored * probs) ** (-self.beta)
+        weights /= weights.max()
+
+        batch_inds, env_indices = np.divmod(data_idx, self.n_envs)
+        samples = self._get_indexed_samples(batch_inds, env_indices, env)
+
+        return samples, self.to_torch(weights.astype(np.float32).reshape(-1, 1)), data_idx
+
+    def update_priorities(self, data_idx: np.ndarray, td_errors: np.ndarray):
+        """Store |TD error| + eps as the new priorities of sampled transitions"""
+        priorities = np.abs(td_errors) + self.eps
+        self.max_priority = max(self.max_priority, float(priorities.max()))
+        self.tree.update(data_idx, priorities ** self.alpha)
+
+    def _get_indexed_samples(self, batch_inds: np.ndarray, env_indices: np.ndarray, env=None) -> ReplayBufferSamples:
+        # Same as ReplayBuffer._get_samples, but with the env index chosen
+        # by the sum-tree instead of uniformly at random
+        data = (
+            self._normalize_obs(self.observations[batch_inds, env_indices, :], env),
+            self.actions[batch_inds, env_indices, :],
+            self._normalize_obs(self.next_observations[batch_inds, env_indices, :], env),
+            (self.dones[batch_inds, env_indices] * (1 - self.timeouts[batch_inds, env_indices])).reshape(-1, 1),
+            self._normalize_reward(self.rewards[batch_inds, env_indices].reshape(-1, 1), env),
+        )
+        return ReplayBufferSamples(*tuple(map(self.to_torch, data)))
+
+
+class PrioritizedDQN(DQN):
+    """DQN trained from a PrioritizedReplayBuffer with importance-sampling weights"""
+
+    def train(self, gradient_steps: int, batch_size: int = 100) -> None:
+        # Switch to train mode (this affects batch norm / dropout)
+        self.policy.set_training_mode(True)
+        # Update learning rate according to schedule
+        self._update_learning_rate(self.policy.optimizer)
+
+        # Anneal the importance-sampling exponent towards 1 over training
+        buffer = self.replay_buffer
+        buffer.beta = buffer.beta_start + (1.0 - buffer.beta_start) * (1.0 - self._current_progress_remaining)
+
+        losses = []
+        for _ in range(gradient_steps):
+            replay_data, weights, data_idx = buffer.sample_prioritized(batch_size, env=self._vec_normalize_env)
+
+            with th.no_grad():
+                # Compute the next Q-values using the target network
+                next_q_values = self.q_net_target(replay_data.next_observations)
+                # Follow greedy policy: use the one with the highest value
+                next_q_values, _ = next_q_values.max(dim=1)
+                next_q_values = next_q_values.reshape(-1, 1)
+                # 1-step TD target
+                target_q_values = replay_data.rewards + (1 - replay_data.dones) * self.gamma * next_q_values
+
+            # Get current Q-values estimates for the actions in the batch
+            current_q_values = self.q_net(replay_data.observations)
+            current_q_values = th.gather(current_q_values, dim=1, index=replay_data.actions.long())
+
+            # Huber loss, weighted per sample
+            elementwise_loss = F.smooth_l1_loss(current_q_values, target_q_values, reduction='none')
+            loss = (weights * elementwise_loss).mean()
+            losses.append(loss.item())
+
+            # Optimize the policy
+            self.policy.optimizer.zero_grad()
+            loss.backward()
+            # Clip gradient norm
+            th.nn.utils.clip_grad_norm_(self.policy.parameters(), self.max_grad_norm)
+            self.policy.optimizer.step()
+
+            td_errors = (current_q_values - target_q_values).detach().cpu().numpy().ravel()
+            buffer.update_priorities(data_idx, td_errors)
+
+        # Increase update counter
+        self._n_updates += gradient_steps
+
+        self.logger.record("train/n_updates", self._n_updates, exclude="tensorboard")
+        self.logger.record("train/loss", np.mean(losses))
+        self.logger.record("train/per_beta", buffer.beta)
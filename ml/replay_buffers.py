@@ -0,0 +1,57 @@
+"""
+Replay Buffer for DQN Training
+
+FastReplayBuffer is Stable Baselines3's ReplayBuffer without the redundant
+np.array() copies in add(), and with sampled batches sent to CUDA devices
+through pinned memory. It is passed to DQN through replay_buffer_class
+(and is the base of PrioritizedReplayBuffer), so no SB3 module is patched.
+"""
+
+import numpy as np
+import torch as th
+from gymnasium import spaces
+from stable_baselines3.common.buffers import ReplayBuffer
+
+
+class FastReplayBuffer(ReplayBuffer):
+    """
+    ReplayBuffer whose add() assigns the env's arrays straight into storage
+
+    SB3 wraps every observation, action, reward and done in np.array(...)
+    before assigning it into the preallocated arrays. The slot assignment
+    already copies, so the extra np.array is a second copy per step.
+    """
+
+    def add(self, obs, next_obs, action, reward, done, infos) -> None:
+        # Same as ReplayBuffer.add, minus the np.array(...) wrappers
+        if isinstance(self.observation_space, spaces.Discrete):
+            obs = obs.reshape((self.n_envs, *self.obs_shape))
+            next_obs = next_obs.reshape((self.n_envs, *self.obs_shape))
+
+        action = action.reshape((self.n_envs, self.action_dim))
+
+        self.observations[self.pos] = obs
+
+        if self.optimize_memory_usage:
+            self.observations[(self.pos + 1) % self.buffer_size] = next_obs
+        else:
+            self.next_observations[self.pos] = next_obs
+
+        self.actions[self.pos] = action
+        self.rewards[self.pos] = reward
+        self.dones[self.pos] = done
+
+        if self.handle_timeout_termination:
+            self.timeouts[self.pos] = [info.get("TimeLimit.truncated", False) for info in infos]
+
+        self.pos += 1
+        if self.pos == self.buffer_size:
+            self.full = True
+            self.pos = 0
+
+    def to_torch(self, array: np.ndarray, copy: bool = True) -> th.Tensor:
+        # Pinned host memory makes the host-to-GPU copy asynchronous; on CPU
+        # pinning is pure overhead, so keep SB3's conversion there
+        if self.device.type != 'cuda':
+            return super(FastReplayBuffer, self).to_torch(array, copy)
+        return th.from_numpy(array).pin_memory().to(self.device, non_blocking=True)
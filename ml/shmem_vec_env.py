@@ -0,0 +1,228 @@
+"""
+Shared-memory Vectorized Environment
+
+SubprocVecEnv pickles every observation through a pipe on each step.
+ShmemVecEnv runs each env in a worker process the same way, but each
+worker writes its observation into its own row of one shared
+[n_envs, *obs_shape] array, so the pipe only carries rewards, dones and
+infos. Stable Baselines3 ships no shared-memory VecEnv, so this provides:
+  - _shmem_worker: worker loop that steps one env and writes its
+    observations into shared memory
+  - ShmemVecEnv: drop-in SubprocVecEnv for Box observation spaces
+
+The worker loop and its message formats live here rather than reusing
+SB3's private subprocess worker, whose protocol changes between 2.x
+releases; only SB3's public VecEnv interface is relied on.
+"""
+
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+import numpy as np
+from gymnasium import spaces
+from stable_baselines3.common.env_util import is_wrapped
+from stable_baselines3.common.vec_env.base_vec_env import CloudpickleWrapper, VecEnv
+
+
+def _shmem_worker(remote, parent_remote, env_fn_wrapper) -> None:
+    """
+    Run one env, answering commands from the parent over `remote`
+
+    Observations from step and reset go into this worker's row of the
+    shared array (attached by the 'attach_shmem' command) instead of the pipe.
+    """
+    parent_remote.close()
+    env = env_fn_wrapper.var()
+    shm = None
+    obs = None
+    reset_info = {}
+    while True:
+        try:
+            cmd, data = remote.recv()
+            if cmd == 'step':
+                observation, reward, terminated, truncated, info = env.step(data)
+                # SB3 VecEnv convention: auto-reset, keeping the final observation
+                done = terminated or truncated
+                info['TimeLimit.truncated'] = truncated and not terminated
+                if done:
+                    info['terminal_observation'] = observation
+                    observation, reset_info = env.reset()
+                obs[...] = observation
+                remote.send((reward, done, info, reset_info))
+            elif cmd == 'reset':
+                seed, options = data
+                observation, reset_info = env.reset(seed=seed, options=options)
+                obs[...] = observation
+                remote.send(reset_info)
+            elif cmd == 'attach_shmem':
+                name, shape, dtype, index = data
+                shm = shared_memory.SharedMemory(name=name)
+                obs = np.ndarray(shape, dtype=dtype, buffer=shm.buf)[index]
+            elif cmd == 'get_spaces':
+                remote.send((env.observation_space, env.action_space))
+            elif cmd == 'render':
+                remote.send(env.render())
+            elif cmd == 'env_method':
+                method_name, args, kwargs = data
+                remote.send(env.get_wrapper_attr(method_name)(*args, **kwargs))
+            elif cmd == 'get_attr':
+                # A missing attribute is sent back so the parent can raise it
+                try:
+                    remote.send(env.get_wrapper_attr(data))
+                except AttributeError as exc:
+                    remote.send(exc)
+            elif cmd == 'set_attr':
+                attr_name, value = data
+                setattr(env, attr_name, value)
+                remote.send(None)
+            elif cmd == 'is_wrapped':
+                remote.send(is_wrapped(env, data))
+            elif cmd == 'close':
+                env.close()
+                break
+            else:
+                raise NotImplementedError(f"`{cmd}` is not implemented in the worker")
+        except (EOFError, KeyboardInterrupt):
+            break
+
+    if shm is not None:
+        # Drop the numpy view first; SharedMemory refuses to close while it is exported
+        obs = None
+        shm.close()
+    remote.close()
+
+
+class ShmemVecEnv(VecEnv):
+    """
+    Vectorized env with one subprocess per env, returning observations
+    through shared memory
+
+    The pipe write that follows each observation write orders it before the
+    parent's recv, so no extra locking is needed. step() and reset() return
+    a copy of the shared array, since workers overwrite it on the next step.
+    """
+
+    def __init__(self, env_fns, start_method: str = None):
+        self.waiting = False
+        self.closed = False
+        self._shm = None
+        n_envs = len(env_fns)
+
+        if start_method is None:
+            forkserver_available = 'forkserver' in mp.get_all_start_methods()
+            start_method = 'forkserver' if forkserver_available else 'spawn'
+        ctx = mp.get_context(start_method)
+
+        self.remotes, self.work_remotes = zip(*[ctx.Pipe() for _ in range(n_envs)])
+        self.processes = []
+        for work_remote, remote, env_fn in zip(self.work_remotes, self.remotes, env_fns):
+            args = (work_remote, remote, CloudpickleWrapper(env_fn))
+            # daemon=True: if the main process crashes, we should not cause things to hang
+            process = ctx.Process(target=_shmem_worker, args=args, daemon=True)
+            process.start()
+            self.processes.append(process)
+            work_remote.close()
+
+        self.remotes[0].send(('get_spaces', None))
+        observation_space, action_space = self.remotes[0].recv()
+        if not isinstance(observation_space, spaces.Box):
+            self.close()
+            raise ValueError("ShmemVecEnv only supports Box observation spaces")
+
+        # One [n_envs, *obs_shape] array shared by all workers
+        shape = (n_envs,) + observation_space.shape
+        dtype = observation_space.dtype
+        self._shm = shared_memory.SharedMemory(create=True, size=max(int(np.prod(shape)) * dtype.itemsize, 1))
+        self._obs = np.ndarray(shape, dtype=dtype, buffer=self._shm.buf)
+        for index, remote in enumerate(self.remotes):
+            remote.send(('attach_shmem', (self._shm.name, shape, dtype.str, index)))
+
+        # Seeds and options for the next reset() only
+        self._next_seeds = [None] * n_envs
+        self._next_options = [None] * n_envs
+
+        VecEnv.__init__(self, n_envs, observation_space, action_space)
+        self.reset_infos = [{} for _ in range(n_envs)]
+
+    def seed(self, seed: int = None) -> list:
+        """Seed each env with seed + rank at the next reset()"""
+        if seed is None:
+            # Still give every worker a different seed
+            seed = int(np.random.randint(0, np.iinfo(np.uint32).max, dtype=np.uint32))
+        self._next_seeds = [seed + rank for rank in range(self.num_envs)]
+        return self._next_seeds
+
+    def set_options(self, options=None) -> None:
+        """Pass reset options (one dict, or one per env) to the next reset()"""
+        if not isinstance(options, list):
+            options = [options] * self.num_envs
+        self._next_options = list(options)
+
+    def reset(self):
+        for remote, seed, options in zip(self.remotes, self._next_seeds, self._next_options):
+            remote.send(('reset', (seed, options)))
+        self.reset_infos = [remote.recv() for remote in self.remotes]
+        # Seeds and options are only used once
+        self._next_seeds = [None] * self.num_envs
+        self._next_options = [None] * self.num_envs
+        return self._obs.copy()
+
+    def step_async(self, actions: np.ndarray) -> None:
+        for remote, action in zip(self.remotes, actions):
+            remote.send(('step', action))
+        self.waiting = True
+
+    def step_wait(self):
+        results = [remote.recv() for remote in self.remotes]
+        self.waiting = False
+        rews, dones, infos, self.reset_infos = zip(*results)
+        return self._obs.copy(), np.stack(rews), np.stack(dones), infos
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        if self.waiting:
+            for remote in self.remotes:
+                remote.recv()
+        for remote in self.remotes:
+            remote.send(('close', None))
+        for process in self.processes:
+            process.join()
+        self.closed = True
+        if self._shm is not None:
+            self._obs = None
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def get_images(self) -> list:
+        for remote in self.remotes:
+            remote.send(('render', None))
+        return [remote.recv() for remote in self.remotes]
+
+    def get_attr(self, attr_name: str, indices=None) -> list:
+        values = self._call('get_attr', attr_name, indices)
+        for value in values:
+            if isinstance(value, AttributeError):
+                raise value
+        return values
+
+    def set_attr(self, attr_name: str, value, indices=None) -> None:
+        self._call('set_attr', (attr_name, value), indices)
+
+    def env_method(self, method_name: str, *method_args, indices=None, **method_kwargs) -> list:
+        return self._call('env_method', (method_name, method_args, method_kwargs), indices)
+
+    def env_is_wrapped(self, wrapper_class, indices=None) -> list:
+        return self._call('is_wrapped', wrapper_class, indices)
+
+    def _call(self, cmd: str, data, indices) -> list:
+        """Send one command to the envs at `indices` (all by default) and collect the replies"""
+        if indices is None:
+            indices = range(self.num_envs)
+        elif isinstance(indices, int):
+            indices = [indices]
+        remotes = [self.remotes[i] for i in indices]
+        for remote in remotes:
+            remote.send((cmd, data))
+        return [remote.recv() for remote in remotes]
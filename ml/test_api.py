@@ -6,10 +6,13 @@ Run this AFTER starting api_server.py to verify it's working.
 import requests
 import numpy as np
 
+from latency import timed, print_latency_summary
+
 def test_health():
     """Test the /health endpoint"""
     try:
-        response = requests.get('http://localhost:5000/health')
+        with timed("health"):
+            response = requests.get('http://localhost:5000/health')
         print("✅ Health Check:", response.json())
         return response.json().get('model_loaded', False)
     except Exception as e:
@@ -32,10 +35,11 @@ def test_predict():
             0, 0, 0  # Padding
         ]
         
-        response = requests.post(
-            'http://localhost:5000/predict',
-            json={'state': sample_state}
-        )
+        with timed("predict"):
+            response = requests.post(
+                'http://localhost:5000/predict',
+                json={'state': sample_state}
+            )
         
         result = response.json()
         print("✅ Predict Response:", result)
@@ -77,3 +81,5 @@ if __name__ == '__main__':
         print("3. Watch the console for RL decisions")
     else:
         print("\n❌ Tests failed. Check api_server.py logs for errors.")
+    
+    print_latency_summary()
@@ -6,13 +6,16 @@ Quick test to verify API and model are working
 import requests
 import json
 
+from latency import timed, print_latency_summary
+
 API_URL = "http://localhost:5000"
 
 def test_health():
     """Test if API is running"""
     print("\n1️⃣  Testing API Health...")
     try:
-        response = requests.get(f"{API_URL}/health", timeout=5)
+        with timed("health"):
+            response = requests.get(f"{API_URL}/health", timeout=5)
         data = response.json()
         
         print(f"   Status: {data['status']}")
@@ -28,18 +31,19 @@ def test_form_simple_good():
     """Test form analysis with good form"""
     print("\n2️⃣  Testing Good Form (Squat 85°, balanced)...")
     try:
-        response = requests.post(
-            f"{API_URL}/predict_form_simple",
-            json={
-                "angles": {
-                    "knee_left": 85,
-                    "knee_right": 87
+        with timed("good"):
+            response = requests.post(
+                f"{API_URL}/predict_form_simple",
+                json={
+                    "angles": {
+                        "knee_left": 85,
+                        "knee_right": 87
+                    },
+                    "movement_speed": 2.5,
+                    "exercise_type": "squat"
                 },
-                "movement_speed": 2.5,
-                "exercise_type": "squat"
-            },
-            timeout=5
-        )
+                timeout=5
+            )
         
         data = response.json()
         print(f"   Form Quality: {data['form_quality']}")
@@ -55,18 +59,19 @@ def test_form_simple_shallow():
     """Test form analysis with shallow squat"""
     print("\n3️⃣  Testing Shallow Squat (110°, too shallow)...")
     try:
-        response = requests.post(
-            f"{API_URL}/predict_form_simple",
-            json={
-                "angles": {
-                    "knee_left": 110,
-                    "knee_right": 108
+        with timed("shallow"):
+            response = requests.post(
+                f"{API_URL}/predict_form_simple",
+                json={
+                    "angles": {
+                        "knee_left": 110,
+                        "knee_right": 108
+                    },
+                    "movement_speed": 2.8,
+                    "exercise_type": "squat"
                 },
-                "movement_speed": 2.8,
-                "exercise_type": "squat"
-            },
-            timeout=5
-        )
+                timeout=5
+            )
         
         data = response.json()
         print(f"   Form Quality: {data['form_quality']}")
@@ -82,18 +87,19 @@ def test_form_simple_asymmetric():
     """Test form analysis with asymmetric squat"""
     print("\n4️⃣  Testing Asymmetric Squat (left 80°, right 100°)...")
     try:
-        response = requests.post(
-            f"{API_URL}/predict_form_simple",
-            json={
-                "angles": {
-                    "knee_left": 80,
-                    "knee_right": 100
+        with timed("asymmetric"):
+            response = requests.post(
+                f"{API_URL}/predict_form_simple",
+                json={
+                    "angles": {
+                        "knee_left": 80,
+                        "knee_right": 100
+                    },
+                    "movement_speed": 2.5,
+                    "exercise_type": "squat"
                 },
-                "movement_speed": 2.5,
-                "exercise_type": "squat"
-            },
-            timeout=5
-        )
+                timeout=5
+            )
         
         data = response.json()
         print(f"   Form Quality: {data['form_quality']}")
@@ -110,18 +116,19 @@ def test_form_simple_fast():
     """Test form analysis with fast movement"""
     print("\n5️⃣  Testing Fast Movement (1 second per rep)...")
     try:
-        response = requests.post(
-            f"{API_URL}/predict_form_simple",
-            json={
-                "angles": {
-                    "knee_left": 88,
-                    "knee_right": 90
+        with timed("fast"):
+            response = requests.post(
+                f"{API_URL}/predict_form_simple",
+                json={
+                    "angles": {
+                        "knee_left": 88,
+                        "knee_right": 90
+                    },
+                    "movement_speed": 1.0,  # Too fast!
+                    "exercise_type": "squat"
                 },
-                "movement_speed": 1.0,  # Too fast!
-                "exercise_type": "squat"
-            },
-            timeout=5
-        )
+                timeout=5
+            )
         
         data = response.json()
         print(f"   Form Quality: {data['form_quality']}")
@@ -173,6 +180,7 @@ def main():
     else:
         print("\n⚠️  Some tests failed. Check API server logs.")
     
+    print_latency_summary()
     print("=" * 60)
 
 if __name__ == '__main__':
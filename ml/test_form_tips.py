@@ -6,6 +6,8 @@ Tests that the form quality tips are being generated correctly
 import requests
 import json
 
+from latency import timed, print_latency_summary
+
 API_URL = 'http://localhost:5000'
 
 def test_form_tips():
@@ -15,11 +17,12 @@ def test_form_tips():
     
     # Test 1: Good squat form
     print("1️⃣ Testing Good Squat Form...")
-    response = requests.post(f'{API_URL}/predict_form_simple', json={
-        'angles': {'knee_left': 85, 'knee_right': 87},
-        'movement_speed': 2.5,
-        'exercise_type': 'squat'
-    })
+    with timed("good"):
+        response = requests.post(f'{API_URL}/predict_form_simple', json={
+            'angles': {'knee_left': 85, 'knee_right': 87},
+            'movement_speed': 2.5,
+            'exercise_type': 'squat'
+        })
     result = response.json()
     print(f"   Form Quality: {result['form_quality']}")
     print(f"   Status: {result['is_correct']}")
@@ -29,11 +32,12 @@ def test_form_tips():
     
     # Test 2: Shallow squat (should get tips to squat deeper)
     print("2️⃣ Testing Shallow Squat (needs tips)...")
-    response = requests.post(f'{API_URL}/predict_form_simple', json={
-        'angles': {'knee_left': 110, 'knee_right': 112},
-        'movement_speed': 2.5,
-        'exercise_type': 'squat'
-    })
+    with timed("shallow"):
+        response = requests.post(f'{API_URL}/predict_form_simple', json={
+            'angles': {'knee_left': 110, 'knee_right': 112},
+            'movement_speed': 2.5,
+            'exercise_type': 'squat'
+        })
     result = response.json()
     print(f"   Form Quality: {result['form_quality']}")
     print(f"   Status: {result['is_correct']}")
@@ -43,11 +47,12 @@ def test_form_tips():
     
     # Test 3: Asymmetric squat (should get balance tips)
     print("3️⃣ Testing Asymmetric Squat (needs balance tips)...")
-    response = requests.post(f'{API_URL}/predict_form_simple', json={
-        'angles': {'knee_left': 80, 'knee_right': 100},
-        'movement_speed': 2.5,
-        'exercise_type': 'squat'
-    })
+    with timed("asymmetric"):
+        response = requests.post(f'{API_URL}/predict_form_simple', json={
+            'angles': {'knee_left': 80, 'knee_right': 100},
+            'movement_speed': 2.5,
+            'exercise_type': 'squat'
+        })
     result = response.json()
     print(f"   Form Quality: {result['form_quality']}")
     print(f"   Corrections: {result.get('corrections', [])}")
@@ -56,11 +61,12 @@ def test_form_tips():
     
     # Test 4: Fast movement (should get speed tips)
     print("4️⃣ Testing Fast Movement (needs tempo tips)...")
-    response = requests.post(f'{API_URL}/predict_form_simple', json={
-        'angles': {'knee_left': 88, 'knee_right': 90},
-        'movement_speed': 1.0,  # Too fast
-        'exercise_type': 'squat'
-    })
+    with timed("fast"):
+        response = requests.post(f'{API_URL}/predict_form_simple', json={
+            'angles': {'knee_left': 88, 'knee_right': 90},
+            'movement_speed': 1.0,  # Too fast
+            'exercise_type': 'squat'
+        })
     result = response.json()
     print(f"   Form Quality: {result['form_quality']}")
     print(f"   Corrections: {result.get('corrections', [])}")
@@ -69,11 +75,12 @@ def test_form_tips():
     
     # Test 5: Hip exercise
     print("5️⃣ Testing Hip Exercise...")
-    response = requests.post(f'{API_URL}/predict_form_simple', json={
-        'angles': {'hip_left': 130},
-        'movement_speed': 2.5,
-        'exercise_type': 'hip_abduction_left'
-    })
+    with timed("hip"):
+        response = requests.post(f'{API_URL}/predict_form_simple', json={
+            'angles': {'hip_left': 130},
+            'movement_speed': 2.5,
+            'exercise_type': 'hip_abduction_left'
+        })
     result = response.json()
     print(f"   Form Quality: {result['form_quality']}")
     print(f"   Corrections: {result.get('corrections', [])}")
@@ -82,11 +89,12 @@ def test_form_tips():
     
     # Test 6: Shoulder exercise
     print("6️⃣ Testing Shoulder Exercise...")
-    response = requests.post(f'{API_URL}/predict_form_simple', json={
-        'angles': {'shoulder_left': 70},  # Too low
-        'movement_speed': 2.5,
-        'exercise_type': 'shoulder'
-    })
+    with timed("shoulder"):
+        response = requests.post(f'{API_URL}/predict_form_simple', json={
+            'angles': {'shoulder_left': 70},  # Too low
+            'movement_speed': 2.5,
+            'exercise_type': 'shoulder'
+        })
     result = response.json()
     print(f"   Form Quality: {result['form_quality']}")
     print(f"   Corrections: {result.get('corrections', [])}")
@@ -96,6 +104,8 @@ def test_form_tips():
     print("✅ Form tips test complete!")
     print("\n💡 Tips should now appear in the demo UI under 'Tips to Improve Form' panel")
     print("   The tips are generated client-side based on form quality and detected issues")
+    
+    print_latency_summary()
 
 if __name__ == '__main__':
     try:
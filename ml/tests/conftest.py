@@ -0,0 +1,36 @@
+"""
+Shared pytest fixtures for the Pose2Play test suite
+Heavy imports (requests, gymnasium) happen inside the fixtures so they
+are only paid for by the tests that actually use them.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+@pytest.fixture(scope="session")
+def session():
+    """One keep-alive HTTP session (and connection pool) for the whole test run"""
+    import requests
+    from requests.adapters import HTTPAdapter
+    
+    # Runs once per pytest-xdist worker process, so workers never share
+    # sockets; 16 pooled connections cover the concurrent form-analysis
+    # requests issued from a thread pool
+    s = requests.Session()
+    s.mount('http://', HTTPAdapter(pool_connections=4, pool_maxsize=16))
+    yield s
+    s.close()
+
+
+@pytest.fixture(scope="session")
+def env():
+    """One RehabExerciseEnv for the whole test run (tests reset it first)"""
+    from envs.rehab_env import RehabExerciseEnv
+    
+    return RehabExerciseEnv()
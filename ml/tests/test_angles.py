@@ -3,9 +3,9 @@ Unit tests for angle calculation (JavaScript functions simulated in Python)
 Tests: Angle Calculation
 """
 
-import unittest
-import numpy as np
 import math
+import numpy as np
+import pytest
 
 
 class MockLandmark:
@@ -35,190 +35,100 @@ def calculate_angle(a, b, c):
     return angle
 
 
-class TestAngleCalculation(unittest.TestCase):
-    """Test geometric angle calculations (Angle Calculation)"""
-    
-    def test_01_right_angle_90_degrees(self):
-        """Test calculation of 90° angle"""
-        p1 = MockLandmark(0, 0)      # Point A
-        p2 = MockLandmark(1, 0)      # Point B (vertex)
-        p3 = MockLandmark(1, 1)      # Point C
-        
-        angle = calculate_angle(p1, p2, p3)
-        
-        self.assertAlmostEqual(angle, 90, delta=1,
-                              msg=f"Expected 90°, got {angle:.2f}°")
-    
-    def test_02_straight_line_180_degrees(self):
-        """Test calculation of 180° angle (straight line)"""
-        p1 = MockLandmark(0, 0)
-        p2 = MockLandmark(1, 0)
-        p3 = MockLandmark(2, 0)
-        
-        angle = calculate_angle(p1, p2, p3)
-        
-        self.assertAlmostEqual(angle, 180, delta=1,
-                              msg=f"Expected 180°, got {angle:.2f}°")
-    
-    def test_03_acute_angle_45_degrees(self):
-        """Test calculation of 45° angle"""
-        p1 = MockLandmark(0, 0)
-        p2 = MockLandmark(1, 0)
-        p3 = MockLandmark(1.707, 0.707)  # 45° from horizontal
-        
-        angle = calculate_angle(p1, p2, p3)
-        
-        # Function returns interior angle (135° for this configuration)
-        self.assertAlmostEqual(angle, 135, delta=2,
-                              msg=f"Expected 135° interior angle, got {angle:.2f}°")
-    
-    def test_04_obtuse_angle_135_degrees(self):
-        """Test calculation of 135° angle"""
-        p1 = MockLandmark(0, 0)
-        p2 = MockLandmark(1, 0)
-        p3 = MockLandmark(0.293, 0.707)  # 135° from horizontal
-        
-        angle = calculate_angle(p1, p2, p3)
-        
-        # Function returns interior angle (45° for this configuration)
-        self.assertAlmostEqual(angle, 45, delta=2,
-                              msg=f"Expected 45° interior angle, got {angle:.2f}°")
-    
-    def test_05_squat_knee_angle_standing(self):
-        """Test knee angle when standing (should be ~180°)"""
-        hip = MockLandmark(0.5, 0.3)
-        knee = MockLandmark(0.5, 0.6)
-        ankle = MockLandmark(0.5, 0.9)
-        
-        angle = calculate_angle(hip, knee, ankle)
-        
-        # Standing should be close to 180°
-        self.assertGreater(angle, 170, 
-                          f"Standing knee angle should be >170°, got {angle:.2f}°")
-    
-    def test_06_squat_knee_angle_squatting(self):
-        """Test knee angle when squatting (should be ~90°)"""
-        hip = MockLandmark(0.5, 0.5)
-        knee = MockLandmark(0.5, 0.7)
-        ankle = MockLandmark(0.6, 0.7)
-        
-        angle = calculate_angle(hip, knee, ankle)
-        
-        # Squatting should be closer to 90°
-        self.assertLess(angle, 120,
-                       f"Squatting knee angle should be <120°, got {angle:.2f}°")
-    
-    def test_07_hip_flexion_angle_standing(self):
-        """Test hip angle when standing (should be ~180°)"""
-        shoulder = MockLandmark(0.5, 0.2)
-        hip = MockLandmark(0.5, 0.5)
-        knee = MockLandmark(0.5, 0.8)
-        
-        angle = calculate_angle(shoulder, hip, knee)
-        
-        self.assertGreater(angle, 170,
-                          f"Standing hip angle should be >170°, got {angle:.2f}°")
-    
-    def test_08_hip_flexion_angle_raised(self):
-        """Test hip angle with leg raised (should be ~90°)"""
-        shoulder = MockLandmark(0.5, 0.2)
-        hip = MockLandmark(0.5, 0.5)
-        knee = MockLandmark(0.7, 0.5)  # Leg raised horizontally
-        
-        angle = calculate_angle(shoulder, hip, knee)
-        
-        self.assertLess(angle, 100,
-                       f"Raised leg hip angle should be <100°, got {angle:.2f}°")
-    
-    def test_09_shoulder_angle_arm_down(self):
-        """Test shoulder angle with arm down (should be small)"""
-        hip = MockLandmark(0.5, 0.5)
-        shoulder = MockLandmark(0.5, 0.2)
-        elbow = MockLandmark(0.5, 0.3)
-        
-        angle = calculate_angle(hip, shoulder, elbow)
-        
-        self.assertLess(angle, 30,
-                       f"Arm down shoulder angle should be <30°, got {angle:.2f}°")
-    
-    def test_10_shoulder_angle_arm_raised(self):
-        """Test shoulder angle with arm raised (should be ~90°)"""
-        hip = MockLandmark(0.5, 0.5)
-        shoulder = MockLandmark(0.5, 0.2)
-        elbow = MockLandmark(0.7, 0.2)  # Arm horizontal
-        
-        angle = calculate_angle(hip, shoulder, elbow)
-        
-        self.assertGreater(angle, 80,
-                          f"Arm raised shoulder angle should be >80°, got {angle:.2f}°")
-        self.assertLess(angle, 100,
-                       f"Arm raised shoulder angle should be <100°, got {angle:.2f}°")
-    
-    def test_11_angle_always_positive(self):
-        """Test that calculated angles are always positive"""
-        # Test various random configurations
-        for _ in range(100):
-            p1 = MockLandmark(np.random.random(), np.random.random())
-            p2 = MockLandmark(np.random.random(), np.random.random())
-            p3 = MockLandmark(np.random.random(), np.random.random())
-            
-            angle = calculate_angle(p1, p2, p3)
-            
-            self.assertGreaterEqual(angle, 0, "Angle should be positive")
-            self.assertLessEqual(angle, 180, "Angle should be ≤180°")
+def _angle(a, b, c):
+    """Angle at vertex b for three (x, y) tuples"""
+    return calculate_angle(MockLandmark(*a), MockLandmark(*b), MockLandmark(*c))
+
+
+# ============================================================
+# Angle Calculation
+# ============================================================
+
+@pytest.mark.parametrize("a, b, c, expected, delta", [
+    pytest.param((0, 0), (1, 0), (1, 1), 90, 1, id="right_angle_90"),
+    pytest.param((0, 0), (1, 0), (2, 0), 180, 1, id="straight_line_180"),
+    # Function returns interior angle (135° for this configuration)
+    pytest.param((0, 0), (1, 0), (1.707, 0.707), 135, 2, id="acute_45_interior"),
+    # Function returns interior angle (45° for this configuration)
+    pytest.param((0, 0), (1, 0), (0.293, 0.707), 45, 2, id="obtuse_135_interior"),
+])
+def test_exact_angle(a, b, c, expected, delta):
+    """Test calculation of known geometric angles"""
+    angle = _angle(a, b, c)
+    
+    assert angle == pytest.approx(expected, abs=delta), \
+        f"Expected {expected}°, got {angle:.2f}°"
+
+
+@pytest.mark.parametrize("a, b, c, low, high", [
+    # Standing should be close to 180°
+    pytest.param((0.5, 0.3), (0.5, 0.6), (0.5, 0.9), 170, 180, id="knee_standing"),
+    # Squatting should be closer to 90°
+    pytest.param((0.5, 0.5), (0.5, 0.7), (0.6, 0.7), 0, 120, id="knee_squatting"),
+    pytest.param((0.5, 0.2), (0.5, 0.5), (0.5, 0.8), 170, 180, id="hip_standing"),
+    # Leg raised horizontally
+    pytest.param((0.5, 0.2), (0.5, 0.5), (0.7, 0.5), 0, 100, id="hip_leg_raised"),
+    pytest.param((0.5, 0.5), (0.5, 0.2), (0.5, 0.3), 0, 30, id="shoulder_arm_down"),
+    # Arm horizontal
+    pytest.param((0.5, 0.5), (0.5, 0.2), (0.7, 0.2), 80, 100, id="shoulder_arm_raised"),
+])
+def test_body_angle_range(a, b, c, low, high):
+    """Test joint angles for common exercise poses fall in the expected range"""
+    angle = _angle(a, b, c)
+    
+    assert low <= angle <= high, \
+        f"Expected angle in [{low}°, {high}°], got {angle:.2f}°"
+
+
+def test_angle_always_positive():
+    """Test that calculated angles are always positive"""
+    # Test various random configurations
+    points = np.random.random((100, 3, 2))
     
-    def test_12_angle_symmetry(self):
-        """Test that angle calculation is symmetric"""
-        p1 = MockLandmark(0, 0)
-        p2 = MockLandmark(1, 0)
-        p3 = MockLandmark(1, 1)
+    for a, b, c in points:
+        angle = _angle(a, b, c)
         
-        # Calculate angle both ways
-        angle1 = calculate_angle(p1, p2, p3)
-        angle2 = calculate_angle(p3, p2, p1)
-        
-        self.assertAlmostEqual(angle1, angle2, delta=0.1,
-                              msg="Angle should be same regardless of order")
+        assert 0 <= angle <= 180, f"Angle should be in [0°, 180°], got {angle:.2f}°"
+
+
+def test_angle_symmetry():
+    """Test that angle calculation is symmetric"""
+    # Calculate angle both ways
+    angle1 = _angle((0, 0), (1, 0), (1, 1))
+    angle2 = _angle((1, 1), (1, 0), (0, 0))
+    
+    assert angle1 == pytest.approx(angle2, abs=0.1), \
+        "Angle should be same regardless of order"
+
 
+# ============================================================
+# Edge Cases
+# ============================================================
 
-class TestAngleEdgeCases(unittest.TestCase):
-    """Test edge cases for angle calculation"""
+def test_coincident_points():
+    """Test angle with coincident points"""
+    # Should not crash
+    angle = _angle((0, 0), (0, 0), (1, 1))
     
-    def test_01_coincident_points(self):
-        """Test angle with coincident points"""
-        p1 = MockLandmark(0, 0)
-        p2 = MockLandmark(0, 0)  # Same as p1
-        p3 = MockLandmark(1, 1)
-        
-        # Should not crash
-        angle = calculate_angle(p1, p2, p3)
-        self.assertIsInstance(angle, (int, float))
+    assert isinstance(angle, (int, float))
+
+
+def test_very_small_angles():
+    """Test calculation of very small angles"""
+    angle = _angle((0, 0), (1, 0), (2, 0.01))  # Almost straight
     
-    def test_02_very_small_angles(self):
-        """Test calculation of very small angles"""
-        p1 = MockLandmark(0, 0)
-        p2 = MockLandmark(1, 0)
-        p3 = MockLandmark(2, 0.01)  # Almost straight
-        
-        angle = calculate_angle(p1, p2, p3)
-        
-        # Nearly collinear points return ~180° (nearly straight line)
-        self.assertGreater(angle, 175,
-                       f"Nearly collinear should be >175°, got {angle:.2f}°")
+    # Nearly collinear points return ~180° (nearly straight line)
+    assert angle > 175, f"Nearly collinear should be >175°, got {angle:.2f}°"
+
+
+def test_normalized_coordinates():
+    """Test with normalized coordinates (0-1 range, like MediaPipe)"""
+    # MediaPipe returns normalized coordinates
+    angle = _angle((0.45, 0.62), (0.46, 0.75), (0.47, 0.92))
     
-    def test_03_normalized_coordinates(self):
-        """Test with normalized coordinates (0-1 range, like MediaPipe)"""
-        # MediaPipe returns normalized coordinates
-        hip = MockLandmark(0.45, 0.62)
-        knee = MockLandmark(0.46, 0.75)
-        ankle = MockLandmark(0.47, 0.92)
-        
-        angle = calculate_angle(hip, knee, ankle)
-        
-        # Should still calculate valid angle
-        self.assertGreaterEqual(angle, 0)
-        self.assertLessEqual(angle, 180)
+    # Should still calculate valid angle
+    assert 0 <= angle <= 180
 
 
 if __name__ == '__main__':
-    unittest.main(verbosity=2)
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,65 @@
+"""
+Unit tests for TorchMLPClassifier
+Tests: Fit / Predict, Pickling
+"""
+
+import copy
+import pickle
+import unittest
+import numpy as np
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from models.form_mlp import TorchMLPClassifier
+
+
+class TestTorchMLPClassifier(unittest.TestCase):
+    """Test the scikit-learn style PyTorch form classifier"""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Fit one small classifier on a linearly separable problem"""
+        rng = np.random.default_rng(0)
+        cls.X = rng.normal(size=(200, 8)).astype(np.float32)
+        cls.y = (cls.X[:, 0] + cls.X[:, 1] > 0).astype(np.int8)
+        cls.clf = TorchMLPClassifier(hidden_layer_sizes=(16,), max_epochs=30, patience=5)
+        cls.clf.fit(cls.X, cls.y)
+    
+    def test_01_predict_proba_shape(self):
+        """Test probabilities are [N, 2] and sum to 1"""
+        proba = self.clf.predict_proba(self.X)
+        
+        self.assertEqual(proba.shape, (len(self.X), 2))
+        np.testing.assert_allclose(proba.sum(axis=1), 1.0, rtol=1e-6)
+    
+    def test_02_predict_matches_proba(self):
+        """Test predict() agrees with the argmax of predict_proba()"""
+        labels = self.clf.predict(self.X)
+        proba = self.clf.predict_proba(self.X)
+        
+        np.testing.assert_array_equal(labels, self.clf.classes_[proba.argmax(axis=1)])
+    
+    def test_03_pickle_keeps_original_usable(self):
+        """Test pickling does not replace the fitted network on the original"""
+        expected = self.clf.predict_proba(self.X)
+        
+        restored = pickle.loads(pickle.dumps(self.clf))
+        
+        # Both the original and the reloaded copy still predict identically
+        np.testing.assert_allclose(self.clf.predict_proba(self.X), expected)
+        np.testing.assert_allclose(restored.predict_proba(self.X), expected)
+        np.testing.assert_array_equal(restored.predict(self.X), self.clf.predict(self.X))
+    
+    def test_04_deepcopy(self):
+        """Test deepcopy produces an independent, working classifier"""
+        clone = copy.deepcopy(self.clf)
+        
+        np.testing.assert_allclose(clone.predict_proba(self.X), self.clf.predict_proba(self.X))
+        self.assertIsNot(clone.model_, self.clf.model_)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+"""
+Unit tests for prioritized experience replay
+Tests: Sum Tree, Prioritized Sampling, Importance Weights
+"""
+
+import unittest
+import numpy as np
+import sys
+from pathlib import Path
+from gymnasium import spaces
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from prioritized_replay import SumTree, PrioritizedReplayBuffer
+
+
+class TestSumTree(unittest.TestCase):
+    """Test the array-backed sum tree"""
+    
+    def setUp(self):
+        """Tree with 5 leaves (not a power of two, so leaf depths differ)"""
+        self.tree = SumTree(5)
+        self.priorities = np.array([1.0, 2.0, 3.0, 4.0, 5.0])
+        self.tree.update(np.arange(5), self.priorities)
+    
+    def test_01_total_is_sum_of_priorities(self):
+        """Test the root holds the sum of all leaf priorities"""
+        self.assertAlmostEqual(self.tree.total, 15.0)
+    
+    def test_02_find_maps_prefix_sums_to_leaves(self):
+        """Test find() returns the leaf each prefix-sum value falls into"""
+        # With a power-of-two capacity the leaves sit left to right in data
+        # order, so prefix sums map to consecutive indices
+        tree = SumTree(4)
+        tree.update(np.arange(4), np.array([1.0, 2.0, 3.0, 4.0]))
+        
+        # Cumulative sums: 1, 3, 6, 10
+        values = np.array([0.5, 1.0, 1.5, 3.0, 3.1, 6.5, 9.9])
+        expected = np.array([0, 0, 1, 1, 2, 3, 3])
+        
+        np.testing.assert_array_equal(tree.find(values), expected)
+    
+    def test_03_update_recomputes_total(self):
+        """Test updating leaves propagates to the root"""
+        self.tree.update(np.array([0, 4]), np.array([10.0, 0.0]))
+        
+        self.assertAlmostEqual(self.tree.total, 10.0 + 2.0 + 3.0 + 4.0)
+        # The zero-priority leaf can no longer be found
+        leaves = self.tree.find(np.linspace(0.01, self.tree.total - 0.01, 200))
+        self.assertNotIn(4, leaves)
+    
+    def test_04_find_matches_priority_proportions(self):
+        """Test uniform prefix-sum draws hit leaves in proportion to priority"""
+        rng = np.random.default_rng(0)
+        leaves = self.tree.find(rng.uniform(0, self.tree.total, size=30000))
+        freq = np.bincount(leaves, minlength=5) / len(leaves)
+        
+        np.testing.assert_allclose(freq, self.priorities / self.priorities.sum(), atol=0.01)
+
+
+class TestPrioritizedReplayBuffer(unittest.TestCase):
+    """Test prioritized sampling and importance-sampling weights"""
+    
+    def setUp(self):
+        """Small CPU buffer over 2 envs with 50 stored steps"""
+        obs_space = spaces.Box(low=0, high=1, shape=(4,), dtype=np.float32)
+        self.buffer = PrioritizedReplayBuffer(
+            100, obs_space, spaces.Discrete(5), device='cpu', n_envs=2, alpha=0.6, beta=0.4
+        )
+        for i in range(50):
+            obs = np.full((2, 4), i, dtype=np.float32)
+            self.buffer.add(obs, obs + 1, np.zeros((2, 1)), np.ones(2), np.zeros(2), [{}, {}])
+    
+    def test_01_new_transitions_get_max_priority(self):
+        """Test every stored transition starts at the same (max) priority"""
+        leaves = self.buffer.tree.tree[self.buffer.tree.capacity - 1:][:100]
+        
+        np.testing.assert_allclose(leaves, 1.0)
+        self.assertAlmostEqual(self.buffer.tree.total, 100.0)
+    
+    def test_02_sample_shapes(self):
+        """Test a sample returns batch tensors, [batch, 1] weights and indices"""
+        samples, weights, data_idx = self.buffer.sample_prioritized(32)
+        
+        self.assertEqual(tuple(samples.observations.shape), (32, 4))
+        self.assertEqual(tuple(weights.shape), (32, 1))
+        self.assertEqual(data_idx.shape, (32,))
+        self.assertTrue(np.all(data_idx < 100))
+    
+    def test_03_weights_are_normalised(self):
+        """Test importance weights are (N * P(i))^-beta scaled to max 1"""
+        self.buffer.update_priorities(np.arange(100), np.linspace(0.1, 5.0, 100))
+        
+        _, weights, data_idx = self.buffer.sample_prioritized(64)
+        weights = weights.numpy().ravel()
+        
+        leaves = self.buffer.tree.tree[data_idx + self.buffer.tree.capacity - 1]
+        probs = leaves / self.buffer.tree.total
+        expected = (100 * probs) ** (-self.buffer.beta)
+        
+        self.assertAlmostEqual(weights.max(), 1.0, places=6)
+        np.testing.assert_allclose(weights, expected / expected.max(), rtol=1e-5)
+    
+    def test_04_update_priorities_shifts_sampling(self):
+        """Test a transition with a large TD error is sampled more often"""
+        td_errors = np.full(100, 0.01)
+        td_errors[7] = 100.0
+        self.buffer.update_priorities(np.arange(100), td_errors)
+        
+        _, _, data_idx = self.buffer.sample_prioritized(100)
+        
+        self.assertGreater(np.sum(data_idx == 7), 50)
+        self.assertAlmostEqual(self.buffer.max_priority, 100.0 + self.buffer.eps)
+    
+    def test_05_samples_match_stored_transitions(self):
+        """Test sampled observations come from the (position, env) slot of each index"""
+        samples, _, data_idx = self.buffer.sample_prioritized(16)
+        positions = data_idx // self.buffer.n_envs
+        
+        np.testing.assert_array_equal(samples.observations.numpy()[:, 0], positions)
+        np.testing.assert_array_equal(samples.next_observations.numpy()[:, 0], positions + 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+"""
+Unit tests for ShmemVecEnv
+Tests: Reset / Step Against DummyVecEnv, Observation Copies, Env Attributes
+"""
+
+import unittest
+import numpy as np
+import sys
+from pathlib import Path
+from stable_baselines3.common.vec_env import DummyVecEnv
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from envs.rehab_env import RehabExerciseEnv
+from shmem_vec_env import ShmemVecEnv
+
+
+N_ENVS = 3
+
+
+def _make_env(seed):
+    """Factory for one RehabExerciseEnv seeded with `seed`"""
+    def _init():
+        env = RehabExerciseEnv()
+        env.reset(seed=seed)
+        return env
+    return _init
+
+
+class TestShmemVecEnv(unittest.TestCase):
+    """Test the shared-memory vec env matches an in-process DummyVecEnv"""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Start one set of worker processes for the whole class"""
+        cls.env = ShmemVecEnv([_make_env(seed) for seed in range(N_ENVS)])
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.env.close()
+    
+    def test_01_reset_shape(self):
+        """Test reset returns one observation row per env"""
+        obs = self.env.reset()
+        
+        self.assertEqual(obs.shape, (N_ENVS,) + self.env.observation_space.shape)
+        self.assertEqual(obs.dtype, self.env.observation_space.dtype)
+    
+    def test_02_step_shapes(self):
+        """Test step returns batched obs, rewards, dones and per-env infos"""
+        self.env.reset()
+        obs, rewards, dones, infos = self.env.step(np.ones(N_ENVS, dtype=int))
+        
+        self.assertEqual(obs.shape, (N_ENVS, 20))
+        self.assertEqual(rewards.shape, (N_ENVS,))
+        self.assertEqual(dones.shape, (N_ENVS,))
+        self.assertEqual(len(infos), N_ENVS)
+    
+    def test_03_matches_dummy_vec_env(self):
+        """Test the same seeds and actions give the same trajectories as DummyVecEnv"""
+        actions = np.random.default_rng(0).integers(5, size=(100, N_ENVS))
+        
+        # Each env has its own generator, so running them one at a time in
+        # process with the same seeds reproduces every worker's trajectory
+        expected = []
+        for rank in range(N_ENVS):
+            dummy = DummyVecEnv([_make_env(rank)])
+            dummy.seed(rank)
+            trajectory = [dummy.reset()[0]]
+            for step_actions in actions:
+                obs, rewards, dones, _ = dummy.step(step_actions[rank:rank + 1])
+                trajectory.append((obs[0], rewards[0], dones[0]))
+            expected.append(trajectory)
+            dummy.close()
+        
+        self.env.seed(0)
+        obs = self.env.reset()
+        for rank in range(N_ENVS):
+            np.testing.assert_array_equal(obs[rank], expected[rank][0])
+        
+        for t, step_actions in enumerate(actions, start=1):
+            obs, rewards, dones, _ = self.env.step(step_actions)
+            for rank in range(N_ENVS):
+                exp_obs, exp_reward, exp_done = expected[rank][t]
+                np.testing.assert_array_equal(obs[rank], exp_obs)
+                self.assertEqual(rewards[rank], exp_reward)
+                self.assertEqual(dones[rank], exp_done)
+    
+    def test_04_observations_are_copies(self):
+        """Test returned observations aren't overwritten by later steps"""
+        obs1 = self.env.reset()
+        saved = obs1.copy()
+        
+        self.env.step(np.full(N_ENVS, 2))
+        
+        np.testing.assert_array_equal(obs1, saved)
+        
+        # Editing a returned array doesn't touch the shared buffer either
+        obs2, _, _, _ = self.env.step(np.full(N_ENVS, 1))
+        obs2[:] = -1.0
+        obs3, _, _, _ = self.env.step(np.full(N_ENVS, 1))
+        self.assertTrue(np.all(obs3 >= 0))
+    
+    def test_05_env_attributes_and_methods(self):
+        """Test attribute and method calls reach the worker envs"""
+        self.env.reset()
+        self.env.set_attr('fatigue', 0.25, indices=1)
+        
+        self.assertEqual(self.env.get_attr('fatigue', indices=1), [0.25])
+        self.assertTrue(self.env.has_attr('fatigue'))
+        self.assertFalse(self.env.has_attr('no_such_attribute'))
+        self.assertEqual(self.env.env_is_wrapped(DummyVecEnv), [False] * N_ENVS)
+        
+        states = self.env.env_method('_compute_state')
+        self.assertEqual(len(states), N_ENVS)
+        self.assertAlmostEqual(float(states[1][11]), 0.25)
+
+
+if __name__ == '__main__':
+    unittest.main()
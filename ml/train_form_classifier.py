@@ -11,13 +11,48 @@ import pandas as pd
 import numpy as np
 from pathlib import Path
 import json
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.neural_network import MLPClassifier
+# RF / MLP are looked up through their modules in build_model() so that
+# sklearnex's patch (applied in main) is picked up
+from sklearn import ensemble, neural_network
+from sklearn.ensemble import HistGradientBoostingClassifier
 from sklearn.metrics import classification_report, confusion_matrix, accuracy_score
-from sklearn.model_selection import cross_val_score
+from sklearn.base import clone
+from sklearn.model_selection import cross_validate
+from sklearn.inspection import permutation_importance
 import joblib
 import argparse
 
+from form_feedback import load_onnx_session
+
+try:
+    from sklearnex import patch_sklearn
+except ImportError:
+    patch_sklearn = None
+
+try:
+    from models.form_mlp import TorchMLPClassifier
+except ImportError:
+    TorchMLPClassifier = None
+
+try:
+    from skl2onnx import convert_sklearn
+    from skl2onnx.common.data_types import FloatTensorType
+except ImportError:
+    convert_sklearn = None
+
+try:
+    import lz4  # noqa: F401 - enables joblib's lz4 compression
+    JOBLIB_COMPRESS = ('lz4', 3)
+except ImportError:
+    JOBLIB_COMPRESS = 0
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    from pyarrow import csv as pa_csv
+except ImportError:
+    pa = None
+
 class FormClassifier:
     """Train and evaluate form classification model"""
     
@@ -31,11 +66,15 @@ class FormClassifier:
         # Shoulder exercises would be in upper/ folder
     }
     
-    def __init__(self, data_path: str, model_type: str = 'rf'):
+    # Metadata columns never used for training; skipped while parsing
+    UNUSED_COLUMNS = ['exercise_code', 'subject', 'trial', 'repetition', 'filename', 'sensor_position']
+    
+    def __init__(self, data_path: str, model_type: str = 'hgb'):
         self.data_path = Path(data_path)
         self.model_type = model_type
         self.model = None
         self.feature_names = None
+        self.onnx_session = None
         
     def load_data(self):
         """Load processed training data"""
@@ -50,25 +89,18 @@ class FormClassifier:
             print("   Run: python data_processor.py --input ../Dataset --output ./data/processed")
             return None, None, None, None, None, None
         
-        train_df = pd.read_csv(train_file)
-        val_df = pd.read_csv(val_file)
-        test_df = pd.read_csv(test_file)
+        train_filtered, n_train = self._read_split(train_file)
+        val_filtered, n_val = self._read_split(val_file)
+        test_filtered, n_test = self._read_split(test_file)
         
-        # Filter for hip/knee/shoulder exercises only
-        exercise_col = 'exercise_type' if 'exercise_type' in train_df.columns else 'exercise'
-        
-        train_filtered = train_df[train_df[exercise_col].isin(self.TARGET_EXERCISES.values())]
-        val_filtered = val_df[val_df[exercise_col].isin(self.TARGET_EXERCISES.values())]
-        test_filtered = test_df[test_df[exercise_col].isin(self.TARGET_EXERCISES.values())]
-        
-        print(f"   Original dataset: {len(train_df)} train, {len(val_df)} val, {len(test_df)} test")
+        print(f"   Original dataset: {n_train} train, {n_val} val, {n_test} test")
         print(f"   Filtered (hip/knee/shoulder): {len(train_filtered)} train, {len(val_filtered)} val, {len(test_filtered)} test")
         
         if len(train_filtered) == 0:
             print("⚠️  No hip/knee/shoulder exercises found. Using all exercises...")
-            train_filtered = train_df
-            val_filtered = val_df
-            test_filtered = test_df
+            train_filtered, _ = self._read_split(train_file, filter_exercises=False)
+            val_filtered, _ = self._read_split(val_file, filter_exercises=False)
+            test_filtered, _ = self._read_split(test_file, filter_exercises=False)
         
         # Separate features and labels
         # Label column is 'correct' (0 or 1)
@@ -78,45 +110,108 @@ class FormClassifier:
         drop_cols = ['exercise_code', 'exercise', label_col, 'subject', 'trial', 'repetition', 'filename', 'sensor_position']
         drop_cols = [col for col in drop_cols if col in train_filtered.columns]
         
-        X_train = train_filtered.drop(columns=drop_cols)
-        y_train = train_filtered[label_col]
+        # float32 features / int8 labels: what the estimators compute in anyway,
+        # at half (or an eighth) of the memory
+        X_train = train_filtered.drop(columns=drop_cols).astype(np.float32, copy=False)
+        y_train = train_filtered[label_col].astype(np.int8)
         
-        X_val = val_filtered.drop(columns=drop_cols)
-        y_val = val_filtered[label_col]
+        X_val = val_filtered.drop(columns=drop_cols).astype(np.float32, copy=False)
+        y_val = val_filtered[label_col].astype(np.int8)
         
-        X_test = test_filtered.drop(columns=drop_cols)
-        y_test = test_filtered[label_col]
+        X_test = test_filtered.drop(columns=drop_cols).astype(np.float32, copy=False)
+        y_test = test_filtered[label_col].astype(np.int8)
         
         self.feature_names = X_train.columns.tolist()
         
         print(f"\n📊 Dataset Summary:")
         print(f"   Features: {len(self.feature_names)}")
-        print(f"   Training samples: {len(X_train)} (Correct: {sum(y_train)}, Incorrect: {len(y_train) - sum(y_train)})")
-        print(f"   Validation samples: {len(X_val)} (Correct: {sum(y_val)}, Incorrect: {len(y_val) - sum(y_val)})")
-        print(f"   Test samples: {len(X_test)} (Correct: {sum(y_test)}, Incorrect: {len(y_test) - sum(y_test)})")
+        print(f"   Training samples: {len(X_train)} (Correct: {int(y_train.sum())}, Incorrect: {len(y_train) - int(y_train.sum())})")
+        print(f"   Validation samples: {len(X_val)} (Correct: {int(y_val.sum())}, Incorrect: {len(y_val) - int(y_val.sum())})")
+        print(f"   Test samples: {len(X_test)} (Correct: {int(y_test.sum())}, Incorrect: {len(y_test) - int(y_test.sum())})")
         
         return X_train, X_val, X_test, y_train, y_val, y_test
     
+    def _read_split(self, csv_file: Path, filter_exercises: bool = True):
+        """
+        Read one data split, keeping only the columns used for training
+        
+        With pyarrow installed the CSV is parsed into columnar buffers and the
+        hip/knee/shoulder filter runs in Arrow before any DataFrame is built;
+        otherwise pandas is used.
+        
+        Returns:
+            (DataFrame, number of rows in the file before filtering)
+        """
+        header = pd.read_csv(csv_file, nrows=0).columns
+        columns = [col for col in header if col not in self.UNUSED_COLUMNS]
+        exercise_col = 'exercise_type' if 'exercise_type' in columns else 'exercise'
+        target_exercises = list(self.TARGET_EXERCISES.values())
+        
+        if pa is not None:
+            table = pa_csv.read_csv(
+                csv_file,
+                convert_options=pa_csv.ConvertOptions(include_columns=columns)
+            )
+            n_rows = table.num_rows
+            if filter_exercises:
+                table = table.filter(
+                    pc.is_in(table[exercise_col], value_set=pa.array(target_exercises))
+                )
+            df = table.to_pandas(zero_copy_only=False, self_destruct=True)
+        else:
+            df = pd.read_csv(csv_file, usecols=columns)
+            n_rows = len(df)
+            if filter_exercises:
+                df = df[df[exercise_col].isin(target_exercises)]
+        
+        return df, n_rows
+    
+    @staticmethod
+    def _joblib_pool():
+        """
+        Process-based joblib backend for cross-validation
+        
+        Only wraps cross_validate: under an explicit backend joblib ignores
+        the random forest's prefer="threads" hint, so a full-data fit inside
+        it would ship X and every tree between processes instead of using
+        GIL-free threads. inner_max_num_threads=1 stops each worker's
+        BLAS/OpenMP from also spawning one thread per core.
+        """
+        return joblib.parallel_backend('loky', n_jobs=os.cpu_count(), inner_max_num_threads=1)
+    
     def build_model(self):
         """Build classification model"""
         print(f"\n🔨 Building {self.model_type.upper()} model...")
         
-        if self.model_type == 'rf':
+        if self.model_type == 'hgb':
+            # Histogram Gradient Boosting - binned features, fast fit and predict
+            self.model = HistGradientBoostingClassifier(
+                max_iter=200,
+                max_depth=8,
+                learning_rate=0.1,
+                early_stopping=True,
+                validation_fraction=0.1,
+                random_state=42
+            )
+            print("   Model: Histogram Gradient Boosting")
+            print("   Iterations: up to 200 (early stopping), Max depth: 8")
+            
+        elif self.model_type == 'rf':
             # Random Forest - good for interpretability
-            self.model = RandomForestClassifier(
+            self.model = ensemble.RandomForestClassifier(
                 n_estimators=100,
                 max_depth=10,
                 min_samples_split=5,
                 min_samples_leaf=2,
                 random_state=42,
-                n_jobs=-1
+                n_jobs=-1  # threads; tree building releases the GIL
             )
             print("   Model: Random Forest")
             print("   Trees: 100, Max depth: 10")
             
         elif self.model_type == 'mlp':
             # Neural Network - higher capacity
-            self.model = MLPClassifier(
+            self.model = neural_network.MLPClassifier(
                 hidden_layer_sizes=(128, 64, 32),
                 activation='relu',
                 solver='adam',
@@ -127,6 +222,20 @@ class FormClassifier:
             )
             print("   Model: Multi-Layer Perceptron")
             print("   Architecture: 128 → 64 → 32 → 2")
+            
+        elif self.model_type == 'torch_mlp':
+            # Same architecture as 'mlp', trained with PyTorch (bf16 on CUDA)
+            if TorchMLPClassifier is None:
+                raise ValueError("torch_mlp requires PyTorch - install torch or use --model mlp")
+            self.model = TorchMLPClassifier(
+                hidden_layer_sizes=(128, 64, 32),
+                max_epochs=500,
+                patience=10,
+                validation_fraction=0.1,
+                random_state=42
+            )
+            print("   Model: Multi-Layer Perceptron (PyTorch)")
+            print("   Architecture: 128 → 64 → 32 → 1")
         
         else:
             raise ValueError(f"Unknown model type: {self.model_type}")
@@ -135,6 +244,12 @@ class FormClassifier:
         """Train the model"""
         print("\n🚀 Training model...")
         
+        # Plain arrays (not DataFrames) so joblib can memmap them into CV workers
+        X_train = _as_float32(X_train)
+        X_val = _as_float32(X_val)
+        y_train = np.asarray(y_train, dtype=np.int8)
+        y_val = np.asarray(y_val, dtype=np.int8)
+        
         self.model.fit(X_train, y_train)
         
         # Training accuracy
@@ -147,7 +262,15 @@ class FormClassifier:
         
         # Cross-validation
         print("\n📊 Cross-validation (5-fold)...")
-        cv_scores = cross_val_score(self.model, X_train, y_train, cv=5, n_jobs=-1)
+        # One worker process per fold; the estimator itself runs
+        # single-threaded so folds x trees don't oversubscribe the CPU
+        cv_model = clone(self.model)
+        if 'n_jobs' in cv_model.get_params():
+            cv_model.set_params(n_jobs=1)
+        with self._joblib_pool():
+            cv_results = cross_validate(cv_model, X_train, y_train, cv=5, n_jobs=5,
+                                        return_train_score=False)
+        cv_scores = cv_results['test_score']
         print(f"   CV accuracy: {cv_scores.mean():.3f} ± {cv_scores.std():.3f}")
         
         return train_acc, val_acc
@@ -156,6 +279,8 @@ class FormClassifier:
         """Evaluate on test set"""
         print("\n🧪 Evaluating on test set...")
         
+        X_test = _as_float32(X_test)
+        
         y_pred = self.model.predict(X_test)
         y_proba = self.model.predict_proba(X_test)
         
@@ -176,10 +301,22 @@ class FormClassifier:
         print(f"Actual Incorrect    {cm[0][0]:4d}     {cm[0][1]:4d}")
         print(f"       Correct      {cm[1][0]:4d}     {cm[1][1]:4d}")
         
-        # Feature importance (if Random Forest)
+        # Feature importance (tree models)
+        importances = None
         if self.model_type == 'rf':
-            print("\n🎯 Top 10 Most Important Features:")
             importances = self.model.feature_importances_
+        elif self.model_type == 'hgb':
+            # HGB has no impurity-based importances; permute features on a
+            # test subsample instead to keep the cost bounded
+            n_samples = min(len(X_test), 2000)
+            result = permutation_importance(
+                self.model, X_test[:n_samples], y_test[:n_samples],
+                n_repeats=5, random_state=42, n_jobs=-1
+            )
+            importances = result.importances_mean
+        
+        if importances is not None:
+            print("\n🎯 Top 10 Most Important Features:")
             indices = np.argsort(importances)[::-1][:10]
             
             for i, idx in enumerate(indices, 1):
@@ -202,9 +339,33 @@ class FormClassifier:
             'target_exercises': self.TARGET_EXERCISES
         }
         
-        joblib.dump(model_data, model_file)
+        # lz4 when installed: much smaller RF pickles at near-uncompressed write speed
+        # (joblib.load detects the compression automatically)
+        joblib.dump(model_data, model_file, compress=JOBLIB_COMPRESS)
         print(f"\n💾 Model saved to: {model_file}")
         
+        # ONNX copy alongside the pickle for fast single-sample inference
+        onnx_file = model_file.with_suffix('.onnx')
+        onx = None
+        if convert_sklearn is not None:
+            try:
+                onx = convert_sklearn(
+                    self.model,
+                    initial_types=[('X', FloatTensorType([None, len(self.feature_names)]))],
+                    options={id(self.model): {'zipmap': False}}
+                )
+            except Exception as e:
+                print(f"⚠️  ONNX export skipped: {e}")
+        
+        if onx is not None:
+            with open(onnx_file, 'wb') as f:
+                f.write(onx.SerializeToString())
+            print(f"💾 ONNX model saved to: {onnx_file}")
+        else:
+            # Loaders prefer the .onnx, so an export from a previous run
+            # must not outlive the pickle it was made from
+            onnx_file.unlink(missing_ok=True)
+        
         # Save feature names as JSON
         feature_file = output_dir / 'feature_names.json'
         with open(feature_file, 'w') as f:
@@ -219,6 +380,8 @@ class FormClassifier:
         self.feature_names = model_data['feature_names']
         self.model_type = model_data['model_type']
         print(f"✅ Model loaded from: {model_path}")
+        
+        self.onnx_session = load_onnx_session(model_path, len(self.feature_names))
         return self.model
     
     def predict_form(self, features: np.ndarray):
@@ -226,46 +389,79 @@ class FormClassifier:
         Predict form correctness
         
         Args:
-            features: Array of shape (n_features,) or (n_samples, n_features)
+            features: Array of shape (n_samples, n_features); the first row is scored
         
         Returns:
             dict with 'correct_probability', 'prediction', 'confidence'
         """
+        if features.ndim != 2:
+            raise ValueError(f"features must be 2D (n_samples, n_features), got shape {features.shape}")
+        
+        return self.predict_form_batch(features[:1])[0]
+    
+    def predict_form_batch(self, features_list):
+        """
+        Predict form correctness for many samples with one model call
+        
+        Args:
+            features_list: Sequence of (n_features,) vectors or an (N, n_features) array
+        
+        Returns:
+            list of predict_form dicts, one per sample
+        """
         if self.model is None:
             raise ValueError("Model not trained or loaded!")
         
-        # Ensure 2D array
-        if len(features.shape) == 1:
-            features = features.reshape(1, -1)
+        features = np.ascontiguousarray(np.asarray(features_list, dtype=np.float32))
         
-        # Predict
-        prediction = self.model.predict(features)[0]
-        probabilities = self.model.predict_proba(features)[0]
-        
-        return {
-            'prediction': int(prediction),  # 0 = incorrect, 1 = correct
-            'correct_probability': float(probabilities[1]),
-            'incorrect_probability': float(probabilities[0]),
-            'confidence': float(max(probabilities)),
-            'form_quality': f"{probabilities[1]*100:.1f}%"
-        }
+        # Predict (ONNX Runtime when available, scikit-learn otherwise)
+        if self.onnx_session is not None:
+            predictions, probabilities = self.onnx_session.run(None, {'X': features})
+        else:
+            probabilities = self.model.predict_proba(features)
+            predictions = self.model.classes_[probabilities.argmax(axis=1)]
+        
+        return [
+            {
+                'prediction': int(prediction),  # 0 = incorrect, 1 = correct
+                'correct_probability': float(proba[1]),
+                'incorrect_probability': float(proba[0]),
+                'confidence': float(max(proba)),
+                'form_quality': f"{proba[1]*100:.1f}%"
+            }
+            for prediction, proba in zip(predictions, probabilities)
+        ]
+
+
+def _as_float32(X):
+    """C-contiguous float32 copy of a feature matrix (oneDAL's fast path)"""
+    return np.ascontiguousarray(X, dtype=np.float32)
 
 
 def main():
     parser = argparse.ArgumentParser(description='Train form classification model')
     parser.add_argument('--data', type=str, default='./data/processed',
                         help='Path to processed data directory')
-    parser.add_argument('--model', type=str, default='rf', choices=['rf', 'mlp'],
-                        help='Model type: rf (Random Forest) or mlp (Neural Network)')
+    parser.add_argument('--model', type=str, default='hgb', choices=['hgb', 'rf', 'mlp', 'torch_mlp'],
+                        help='Model type: hgb (Histogram Gradient Boosting), rf (Random Forest), '
+                             'mlp (Neural Network) or torch_mlp (Neural Network on PyTorch)')
     parser.add_argument('--output', type=str, default='./models/form_classifier',
                         help='Output directory for trained model')
+    parser.add_argument('--accel', action='store_true',
+                        help='Use Intel oneDAL (sklearnex) kernels when installed. RF/MLP models '
+                             'trained this way pickle sklearnex classes, so the API server then '
+                             'needs sklearnex installed to load them')
     args = parser.parse_args()
     
+    if args.accel and patch_sklearn is not None:
+        patch_sklearn()
+    
     print("=" * 60)
     print("🏥 FORM CLASSIFICATION MODEL TRAINING")
     print("=" * 60)
     print(f"Target exercises: Hip, Knee, Shoulder")
     print(f"Model type: {args.model.upper()}")
+    print(f"sklearnex acceleration: {'on' if args.accel and patch_sklearn is not None else 'off'}")
     
     # Initialize classifier
     classifier = FormClassifier(args.data, model_type=args.model)
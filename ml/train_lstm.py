@@ -21,7 +21,7 @@ import sys
 import torch
 import torch.nn as nn
 import torch.optim as optim
-from torch.utils.data import DataLoader, random_split
+from torch.utils.data import DataLoader, RandomSampler, random_split
 import numpy as np
 from pathlib import Path
 import csv
@@ -31,7 +31,7 @@ from tqdm.auto import tqdm
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent))
 
-from data.ui_prmd_loader import ShoulderRehabDataset, SEQ_LEN, ANGLE_COLUMN_INDICES
+from data.ui_prmd_loader import ShoulderRehabDataset, SEQ_LEN, ANGLE_COLUMN_INDICES, CACHE_DIR
 from models.lstm_quality import ShoulderLSTM
 
 
@@ -43,9 +43,12 @@ from models.lstm_quality import ShoulderLSTM
 # No hardcoded paths needed!
 
 # Training hyperparameters
-BATCH_SIZE = 16
-LEARNING_RATE = 0.001
-NUM_EPOCHS = 50
+# Batch size 128 with the LR scaled linearly from the original 16 / 0.001,
+# warmed up over the first WARMUP_EPOCHS to keep early steps stable
+BATCH_SIZE = 128
+LEARNING_RATE = 0.001 * (BATCH_SIZE / 16)
+WARMUP_EPOCHS = 5
+NUM_EPOCHS = 25
 TRAIN_SPLIT = 0.8  # 80% train, 20% validation
 
 # Model hyperparameters
@@ -68,17 +71,70 @@ LOG_FILE = LOG_DIR / f"lstm_training_{timestamp}.csv"
 # Device
 DEVICE = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
 
+# bfloat16 autocast on GPUs that support it (same range as fp32, no loss scaling)
+USE_BF16 = DEVICE.type == 'cuda' and torch.cuda.is_bf16_supported()
+
+# torch.compile (PyTorch 2.x) with CUDA graphs; needs static batch shapes
+USE_COMPILE = DEVICE.type == 'cuda' and hasattr(torch, 'compile')
+
 
 # ============================================================
 # Training Functions
 # ============================================================
 
-def calculate_accuracy(logits: torch.Tensor, labels: torch.Tensor) -> float:
-    """Calculate binary classification accuracy."""
-    preds = (torch.sigmoid(logits) > 0.5).float()
-    correct = (preds == labels).float().sum()
-    accuracy = correct / len(labels)
-    return accuracy.item()
+class DeviceBatchLoader:
+    """
+    DataLoader stand-in for a dataset preloaded onto the GPU
+    
+    Batches are gathered by indexing the device tensors directly, so there is
+    no per-batch collate or host-to-device copy. Yields the same
+    (sequences, labels, roms, movement_ids) tuples as the DataLoader, with
+    roms/movement_ids set to None since training doesn't use them.
+    
+    With pad_last=True a short final batch is topped up with samples from
+    the start of the epoch's order, so every batch has the same shape (for
+    torch.compile's CUDA graphs) and no sample is dropped.
+    """
+    
+    def __init__(self, X: torch.Tensor, y: torch.Tensor, indices, batch_size: int, shuffle: bool,
+                 pad_last: bool = False):
+        self.X = X
+        self.y = y
+        self.indices = torch.as_tensor(indices, device=X.device)
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.pad_last = pad_last
+    
+    def __len__(self) -> int:
+        return (len(self.indices) + self.batch_size - 1) // self.batch_size
+    
+    def __iter__(self):
+        indices = self.indices
+        if self.shuffle:
+            indices = indices[torch.randperm(len(indices), device=indices.device)]
+        
+        n_pad = len(self) * self.batch_size - len(indices)
+        if self.pad_last and n_pad > 0:
+            indices = torch.cat([indices, indices[:n_pad]])
+        
+        for i in range(0, len(indices), self.batch_size):
+            idx = indices[i:i + self.batch_size]
+            yield self.X[idx], self.y[idx], None, None
+
+
+def fits_on_device(dataset: ShoulderRehabDataset, device: torch.device) -> bool:
+    """True if the whole dataset can be staged in (at most half of) free GPU memory."""
+    if device.type != 'cuda':
+        return False
+    free_bytes, _ = torch.cuda.mem_get_info(device)
+    n_bytes = len(dataset.sequences) * dataset.sequences[0].size * 4  # float32
+    return n_bytes < free_bytes // 2
+
+
+@torch.jit.script
+def count_correct(logits: torch.Tensor, labels: torch.Tensor) -> torch.Tensor:
+    """Number of correct binary predictions (logits > 0 is sigmoid > 0.5), as a tensor."""
+    return ((logits > 0).to(labels.dtype) == labels).sum()
 
 
 def train_epoch(model: nn.Module, 
@@ -87,53 +143,66 @@ def train_epoch(model: nn.Module,
                 optimizer: optim.Optimizer,
                 device: torch.device,
                 epoch: int,
-                num_epochs: int) -> tuple:
+                num_epochs: int,
+                scheduler=None,
+                num_samples: int = None) -> tuple:
     """
     Train for one epoch.
     
+    If given, scheduler.step() is called after every optimizer step.
+    num_samples is the number of real training samples; rows the loader
+    padded on past it (to keep batch shapes static) are trained on but
+    left out of the accuracy.
+    
     Returns:
       (avg_loss, avg_accuracy, num_correct, num_samples)
     """
     model.train()
     
-    total_loss = 0.0
-    total_correct = 0
+    # Accumulated on-device; synced to Python once per epoch
+    total_loss = torch.zeros((), device=device)
+    total_correct = torch.zeros((), dtype=torch.int64, device=device)
     total_samples = 0
     
     # Progress bar for training batches
     pbar = tqdm(dataloader, desc=f"Epoch {epoch}/{num_epochs} [train]", leave=False)
     
-    for batch_data in pbar:
+    for batch_idx, batch_data in enumerate(pbar):
         # Unpack batch (now includes movement_id)
         sequences, labels, roms, movement_ids = batch_data
         
         # Move to device
-        sequences = sequences.to(device)  # [batch, seq_len, features]
-        labels = labels.squeeze().to(device)  # [batch]
+        sequences = sequences.to(device, non_blocking=True).contiguous()  # [batch, seq_len, features]
+        labels = labels.squeeze().to(device, non_blocking=True)  # [batch]
         
         batch_size = len(labels)
+        if num_samples is not None:
+            batch_size = min(batch_size, num_samples - total_samples)
         
-        # Forward pass
-        logits = model(sequences)  # [batch]
+        # Forward pass (loss computed in fp32)
+        with torch.autocast(device_type=device.type, dtype=torch.bfloat16, enabled=USE_BF16):
+            logits = model(sequences)  # [batch]
+        logits = logits.float()
         loss = criterion(logits, labels)
         
         # Backward pass
         optimizer.zero_grad()
         loss.backward()
         optimizer.step()
+        if scheduler is not None:
+            scheduler.step()
         
         # Metrics
-        preds = (torch.sigmoid(logits) > 0.5).float()
-        correct = (preds == labels).float().sum().item()
-        
-        total_loss += loss.item()
-        total_correct += correct
+        total_loss += loss.detach()
+        total_correct += count_correct(logits.detach()[:batch_size], labels[:batch_size])
         total_samples += batch_size
         
-        # Update progress bar
-        pbar.set_postfix({'loss': f'{loss.item():.4f}'})
+        # Update progress bar (every 10 batches to limit device syncs)
+        if batch_idx % 10 == 0:
+            pbar.set_postfix({'loss': f'{loss.item():.4f}'})
     
-    avg_loss = total_loss / len(dataloader)
+    total_correct = total_correct.item()
+    avg_loss = total_loss.item() / len(dataloader)
     avg_accuracy = total_correct / total_samples
     
     return avg_loss, avg_accuracy, int(total_correct), total_samples
@@ -153,40 +222,42 @@ def validate(model: nn.Module,
     """
     model.eval()
     
-    total_loss = 0.0
-    total_correct = 0
+    # Accumulated on-device; synced to Python once per epoch
+    total_loss = torch.zeros((), device=device)
+    total_correct = torch.zeros((), dtype=torch.int64, device=device)
     total_samples = 0
     
     # Progress bar for validation
     pbar = tqdm(dataloader, desc=f"Epoch {epoch}/{num_epochs} [val]  ", leave=False)
     
-    with torch.no_grad():
-        for batch_data in pbar:
+    with torch.inference_mode():
+        for batch_idx, batch_data in enumerate(pbar):
             # Unpack batch (now includes movement_id)
             sequences, labels, roms, movement_ids = batch_data
             
             # Move to device
-            sequences = sequences.to(device)
-            labels = labels.squeeze().to(device)
+            sequences = sequences.to(device, non_blocking=True).contiguous()  # cuDNN LSTM fast path
+            labels = labels.squeeze().to(device, non_blocking=True)
             
             batch_size = len(labels)
             
-            # Forward pass
-            logits = model(sequences)
+            # Forward pass (loss computed in fp32)
+            with torch.autocast(device_type=device.type, dtype=torch.bfloat16, enabled=USE_BF16):
+                logits = model(sequences)
+            logits = logits.float()
             loss = criterion(logits, labels)
             
             # Metrics
-            preds = (torch.sigmoid(logits) > 0.5).float()
-            correct = (preds == labels).float().sum().item()
-            
-            total_loss += loss.item()
-            total_correct += correct
+            total_loss += loss
+            total_correct += count_correct(logits, labels)
             total_samples += batch_size
             
-            # Update progress bar
-            pbar.set_postfix({'loss': f'{loss.item():.4f}'})
+            # Update progress bar (every 10 batches to limit device syncs)
+            if batch_idx % 10 == 0:
+                pbar.set_postfix({'loss': f'{loss.item():.4f}'})
     
-    avg_loss = total_loss / len(dataloader)
+    total_correct = total_correct.item()
+    avg_loss = total_loss.item() / len(dataloader)
     avg_accuracy = total_correct / total_samples
     
     return avg_loss, avg_accuracy, int(total_correct), total_samples
@@ -239,24 +310,22 @@ def save_checkpoint(model: nn.Module,
 
 def analyze_dataset_distribution(dataset, train_indices, val_indices):
     """Print per-movement distribution in train/val splits."""
-    from collections import Counter
-    
-    train_movements = [dataset.movement_ids[i] for i in train_indices]
-    val_movements = [dataset.movement_ids[i] for i in val_indices]
+    # Map movement names to ints once, then count with bincount
+    movements = sorted(set(dataset.movement_ids))
+    movement_to_int = {m: i for i, m in enumerate(movements)}
+    movement_ids_arr = np.array([movement_to_int[m] for m in dataset.movement_ids], dtype=np.int32)
     
-    train_counter = Counter(train_movements)
-    val_counter = Counter(val_movements)
+    train_counts = np.bincount(movement_ids_arr[np.asarray(train_indices, dtype=np.int64)], minlength=len(movements))
+    val_counts = np.bincount(movement_ids_arr[np.asarray(val_indices, dtype=np.int64)], minlength=len(movements))
     
     print("\nDataset Split by Movement:")
     print(f"  {'Movement':<10} {'Train':<10} {'Val':<10} {'Total':<10}")
     print("  " + "-"*40)
     
-    all_movements = sorted(set(train_movements + val_movements))
-    for movement in all_movements:
-        train_count = train_counter.get(movement, 0)
-        val_count = val_counter.get(movement, 0)
-        total = train_count + val_count
-        print(f"  {movement:<10} {train_count:<10} {val_count:<10} {total:<10}")
+    for movement, train_count, val_count in zip(movements, train_counts, val_counts):
+        if train_count + val_count == 0:
+            continue
+        print(f"  {movement:<10} {train_count:<10} {val_count:<10} {train_count + val_count:<10}")
     print()
 
 
@@ -266,6 +335,17 @@ def train():
     print("LSTM Training for Multi-Exercise Movement Quality")
     print("="*60)
     print(f"Device: {DEVICE}")
+    print(f"Mixed precision: {'bfloat16' if USE_BF16 else 'off'}")
+    
+    if DEVICE.type == 'cpu':
+        torch.set_num_threads(os.cpu_count() or 1)
+    
+    # Sequence length is fixed, so let cuDNN pick the fastest LSTM kernel once
+    torch.backends.cudnn.benchmark = True
+    
+    # Allow TF32 for fp32 matmuls on Ampere+ GPUs
+    if hasattr(torch, 'set_float32_matmul_precision'):
+        torch.set_float32_matmul_precision('high')
     print(f"Log file: {LOG_FILE}")
     print()
     
@@ -276,7 +356,8 @@ def train():
             data_root=None,  # Use automatic path resolution
             seq_len=SEQ_LEN,
             column_indices=ANGLE_COLUMN_INDICES,
-            normalize=True
+            normalize=True,
+            cache_dir=CACHE_DIR  # Reuse preprocessed reps across runs
         )
     except Exception as e:
         print(f"❌ Error loading dataset: {e}")
@@ -306,19 +387,36 @@ def train():
     print()
     
     # Create dataloaders
-    train_loader = DataLoader(
-        train_dataset, 
-        batch_size=BATCH_SIZE, 
-        shuffle=True,
-        num_workers=0  # Use 0 for Windows compatibility
-    )
-    
-    val_loader = DataLoader(
-        val_dataset, 
-        batch_size=BATCH_SIZE, 
-        shuffle=False,
-        num_workers=0
-    )
+    if fits_on_device(dataset, DEVICE):
+        # Stage everything on the GPU once; batches are gathered by index
+        all_X = torch.from_numpy(np.stack(dataset.sequences).astype(np.float32)).to(DEVICE)
+        all_y = torch.tensor(dataset.labels, dtype=torch.float32, device=DEVICE)
+        
+        train_loader = DeviceBatchLoader(all_X, all_y, train_dataset.indices, BATCH_SIZE, shuffle=True,
+                                         pad_last=USE_COMPILE)
+        val_loader = DeviceBatchLoader(all_X, all_y, val_dataset.indices, BATCH_SIZE, shuffle=False)
+        print("Dataset preloaded on GPU")
+    else:
+        # Worker processes + pinned memory overlap batch prep and H2D copies
+        # with GPU compute; on CPU the main process is the better choice
+        num_workers = 0 if DEVICE.type == 'cpu' else min(4, (os.cpu_count() or 2) // 2)
+        loader_kwargs = {
+            'batch_size': BATCH_SIZE,
+            'num_workers': num_workers,
+            'pin_memory': DEVICE.type == 'cuda',
+        }
+        if num_workers > 0:
+            loader_kwargs.update(persistent_workers=True, prefetch_factor=4)
+        
+        if USE_COMPILE:
+            # Static batch shapes without dropping data: draw a whole number
+            # of batches, wrapping into a fresh permutation for the last one
+            n_batches = (len(train_dataset) + BATCH_SIZE - 1) // BATCH_SIZE
+            sampler = RandomSampler(train_dataset, num_samples=n_batches * BATCH_SIZE)
+            train_loader = DataLoader(train_dataset, sampler=sampler, **loader_kwargs)
+        else:
+            train_loader = DataLoader(train_dataset, shuffle=True, **loader_kwargs)
+        val_loader = DataLoader(val_dataset, shuffle=False, **loader_kwargs)
     
     # Create model
     input_size = dataset.sequences[0].shape[1]  # Number of features
@@ -337,17 +435,38 @@ def train():
     print(f"  Total parameters: {sum(p.numel() for p in model.parameters()):,}")
     print()
     
+    # Checkpoints are saved from the eager module so state_dict keys stay unprefixed
+    base_model = model
+    if USE_COMPILE:
+        import torch._dynamo
+        torch._dynamo.config.suppress_errors = True  # fall back to eager on unsupported ops
+        model = torch.compile(model, mode='reduce-overhead', fullgraph=False)
+        
+        # Warm-up forward+backward so compilation isn't counted in epoch 1
+        sequences = next(iter(train_loader))[0].to(DEVICE, non_blocking=True)
+        with torch.autocast(device_type=DEVICE.type, dtype=torch.bfloat16, enabled=USE_BF16):
+            model(sequences).float().sum().backward()
+        model.zero_grad(set_to_none=True)
+        print("Model compiled with torch.compile (reduce-overhead)")
+        print()
+    
     # Loss and optimizer
     criterion = nn.BCEWithLogitsLoss()
     optimizer = optim.Adam(model.parameters(), lr=LEARNING_RATE)
     
-    # Initialize CSV log file
-    with open(LOG_FILE, 'w', newline='') as f:
-        writer = csv.writer(f)
-        writer.writerow([
-            'epoch', 'train_loss', 'train_acc', 'val_loss', 'val_acc',
-            'n_train', 'n_val', 'train_correct', 'val_correct'
-        ])
+    # Linear warmup (per batch) to the full learning rate
+    warmup_steps = max(1, WARMUP_EPOCHS * len(train_loader))
+    scheduler = optim.lr_scheduler.LambdaLR(
+        optimizer, lambda step: min(1.0, (step + 1) / warmup_steps)
+    )
+    
+    # Initialize CSV log file (kept open for the whole run)
+    log_f = open(LOG_FILE, 'w', newline='')
+    log_writer = csv.writer(log_f)
+    log_writer.writerow([
+        'epoch', 'train_loss', 'train_acc', 'val_loss', 'val_acc',
+        'n_train', 'n_val', 'train_correct', 'val_correct'
+    ])
     
     print(f"CSV log initialized: {LOG_FILE}")
     
@@ -358,46 +477,50 @@ def train():
     print("Starting training...")
     print()
     
-    # Progress bar for epochs
-    for epoch in tqdm(range(NUM_EPOCHS), desc="Training Progress", unit="epoch"):
-        # Train
-        train_loss, train_acc, train_correct, n_train = train_epoch(
-            model, train_loader, criterion, optimizer, DEVICE, epoch+1, NUM_EPOCHS
-        )
-        
-        # Validate
-        val_loss, val_acc, val_correct, n_val = validate(
-            model, val_loader, criterion, DEVICE, epoch+1, NUM_EPOCHS
-        )
-        
-        # Log to CSV
-        with open(LOG_FILE, 'a', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow([
+    try:
+        # Progress bar for epochs
+        for epoch in tqdm(range(NUM_EPOCHS), desc="Training Progress", unit="epoch"):
+            # Train
+            train_loss, train_acc, train_correct, n_train = train_epoch(
+                model, train_loader, criterion, optimizer, DEVICE, epoch+1, NUM_EPOCHS, scheduler,
+                num_samples=len(train_dataset)
+            )
+            
+            # Validate
+            val_loss, val_acc, val_correct, n_val = validate(
+                model, val_loader, criterion, DEVICE, epoch+1, NUM_EPOCHS
+            )
+            
+            # Log to CSV (flushed every 10 epochs and when the run ends)
+            log_writer.writerow([
                 epoch + 1, train_loss, train_acc, val_loss, val_acc,
                 n_train, n_val, train_correct, val_correct
             ])
-        
-        # Print progress (one line per epoch)
-        print(f"Epoch {epoch+1:3d}/{NUM_EPOCHS} | "
-              f"Train: Loss={train_loss:.4f} Acc={train_acc:.4f} ({train_correct}/{n_train}) | "
-              f"Val: Loss={val_loss:.4f} Acc={val_acc:.4f} ({val_correct}/{n_val})")
-        
-        # Save best model
-        if val_loss < best_val_loss:
-            best_val_loss = val_loss
-            best_val_accuracy = val_acc
+            if (epoch + 1) % 10 == 0:
+                log_f.flush()
             
-            save_checkpoint(
-                model=model,
-                dataset=dataset,
-                epoch=epoch + 1,
-                val_loss=val_loss,
-                val_accuracy=val_acc,
-                filepath=MODEL_SAVE_PATH
-            )
+            # Print progress (one line per epoch)
+            print(f"Epoch {epoch+1:3d}/{NUM_EPOCHS} | "
+                  f"Train: Loss={train_loss:.4f} Acc={train_acc:.4f} ({train_correct}/{n_train}) | "
+                  f"Val: Loss={val_loss:.4f} Acc={val_acc:.4f} ({val_correct}/{n_val})")
             
-            print(f"         ⭐ New best model saved! Val Loss: {val_loss:.4f}, Val Acc: {val_acc:.4f}")
+            # Save best model
+            if val_loss < best_val_loss:
+                best_val_loss = val_loss
+                best_val_accuracy = val_acc
+                
+                save_checkpoint(
+                    model=base_model,
+                    dataset=dataset,
+                    epoch=epoch + 1,
+                    val_loss=val_loss,
+                    val_accuracy=val_acc,
+                    filepath=MODEL_SAVE_PATH
+                )
+                
+                print(f"         ⭐ New best model saved! Val Loss: {val_loss:.4f}, Val Acc: {val_acc:.4f}")
+    finally:
+        log_f.close()
     
     # Training complete
     print("\n" + "="*60)
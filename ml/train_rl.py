@@ -5,10 +5,15 @@ Uses Deep Q-Network (DQN) to learn optimal difficulty adjustment policy
 """
 
 import os
+from collections import Counter, deque
 import numpy as np
 import pandas as pd
+import torch
+import torch.nn as nn
 from pathlib import Path
 import json
+import matplotlib
+matplotlib.use('Agg')  # Only ever saves PNGs; skip GUI backend detection
 import matplotlib.pyplot as plt
 
 # RL libraries
@@ -17,10 +22,26 @@ from stable_baselines3.common.vec_env import DummyVecEnv
 from stable_baselines3.common.callbacks import BaseCallback, EvalCallback
 from stable_baselines3.common.monitor import Monitor
 
+try:
+    import onnxruntime as ort
+except ImportError:
+    ort = None
+
 # Custom environment
 import sys
 sys.path.append(str(Path(__file__).parent))
 from envs.rehab_env import RehabExerciseEnv
+from prioritized_replay import PrioritizedDQN, PrioritizedReplayBuffer
+from replay_buffers import FastReplayBuffer
+from shmem_vec_env import ShmemVecEnv
+
+
+# Independent seed streams, so evaluation envs never replay training episodes
+# and the model's RNGs (network init, exploration, replay sampling) are
+# seeded apart from both
+TRAIN_SEED_STREAM = 0
+EVAL_SEED_STREAM = 1
+MODEL_SEED_STREAM = 2
 
 
 class RehabTrainingCallback(BaseCallback):
@@ -30,26 +51,47 @@ class RehabTrainingCallback(BaseCallback):
         super(RehabTrainingCallback, self).__init__(verbose)
         self.episode_rewards = []
         self.episode_lengths = []
-        self.current_episode_reward = 0
-        self.current_episode_length = 0
+        self.current_episode_reward = None
+        self._episode_start = None
+        
+        # Last 100 episode rewards with a running sum for the progress log
+        self._recent = deque(maxlen=100)
+        self._recent_sum = 0.0
+    
+    def _on_training_start(self) -> None:
+        # One running total per parallel environment; episode lengths come
+        # from n_calls (one call per vec env step) minus the episode's start
+        n_envs = self.training_env.num_envs
+        self.current_episode_reward = np.zeros(n_envs)
+        self._episode_start = np.zeros(n_envs, dtype=int)
     
     def _on_step(self) -> bool:
-        self.current_episode_reward += self.locals['rewards'][0]
-        self.current_episode_length += 1
-        
-        # Check if episode done
-        if self.locals['dones'][0]:
-            self.episode_rewards.append(self.current_episode_reward)
-            self.episode_lengths.append(self.current_episode_length)
+        # SB3 rebinds rewards / dones every step, so they are read fresh
+        # (one locals lookup each) rather than cached across steps
+        self.current_episode_reward += self.locals['rewards']
+        dones = self.locals['dones']
+        if not dones.any():
+            return True
+        
+        # Check which episodes are done
+        for i in np.flatnonzero(dones):
+            episode_reward = float(self.current_episode_reward[i])
+            self.episode_rewards.append(episode_reward)
+            self.episode_lengths.append(int(self.n_calls - self._episode_start[i]))
+            
+            if len(self._recent) == self._recent.maxlen:
+                self._recent_sum -= self._recent[0]
+            self._recent.append(episode_reward)
+            self._recent_sum += episode_reward
             
             if len(self.episode_rewards) % 100 == 0:
-                avg_reward = np.mean(self.episode_rewards[-100:])
+                avg_reward = self._recent_sum / len(self._recent)
                 print(f"Episode {len(self.episode_rewards)}: "
                       f"Avg Reward (last 100): {avg_reward:.2f}")
             
             # Reset
-            self.current_episode_reward = 0
-            self.current_episode_length = 0
+            self.current_episode_reward[i] = 0
+            self._episode_start[i] = self.n_calls
         
         return True
 
@@ -60,24 +102,67 @@ class RehabRLTrainer:
     def __init__(self, 
                  data_path: str = None,
                  algorithm: str = 'DQN',
-                 output_dir: str = './models'):
+                 output_dir: str = './models',
+                 n_envs: int = 8,
+                 seed: int = None,
+                 prioritized_replay: bool = True):
         
         self.data_path = Path(data_path) if data_path else None
         self.algorithm = algorithm
+        self.n_envs = n_envs
+        # Without a seed, draw one from OS entropy and report it, so the run
+        # can still be reproduced with --seed (it seeds the envs and the model)
+        self.seed = seed if seed is not None else np.random.SeedSequence().entropy
+        self.prioritized_replay = prioritized_replay
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
         
-        # Load user data if available
+        # Load user data if available, as one numpy array per column so the
+        # envs index plain arrays (and workers unpickle arrays, not a DataFrame)
         self.user_data = None
         if self.data_path and self.data_path.exists():
-            self.user_data = pd.read_csv(self.data_path)
-            print(f"✅ Loaded user data: {len(self.user_data)} samples")
+            df = pd.read_csv(self.data_path)
+            self.user_data = {col: df[col].to_numpy() for col in df.columns}
+            print(f"✅ Loaded user data: {len(df)} samples")
+    
+    def _spawn_seeds(self, n: int, stream: int = TRAIN_SEED_STREAM) -> list:
+        """
+        `n` distinct 32-bit seeds from one stream, spawned from the trainer seed
+        
+        Each env draws from its own np_random generator; seeding every env
+        from here keeps the parallel envs distinct and the run reproducible.
+        """
+        seed_seq = np.random.SeedSequence(self.seed, spawn_key=(stream,))
+        return [int(child.generate_state(1)[0]) for child in seed_seq.spawn(n)]
+    
+    def _make_env(self, seed: int, subprocess: bool = False):
+        """
+        Return a factory for one monitored environment seeded with `seed`
+        
+        With subprocess=True the factory also limits the worker process to one
+        torch intra-op thread, so N env workers don't each spawn a thread per
+        core next to the learner. (OMP_NUM_THREADS would come too late here:
+        torch is already imported in the worker.)
+        """
+        def _init():
+            if subprocess:
+                torch.set_num_threads(1)
+            env = Monitor(RehabExerciseEnv(user_data=self.user_data))
+            env.reset(seed=seed)
+            return env
+        return _init
     
     def create_env(self):
-        """Create and wrap environment"""
-        env = RehabExerciseEnv(user_data=self.user_data)
-        env = Monitor(env)
-        return env
+        """
+        Create the vectorized training environment (one subprocess per env)
+        
+        Workers return observations through shared memory, so the per-step
+        pipe traffic is just rewards, dones and infos.
+        """
+        env_fns = [self._make_env(seed, subprocess=self.n_envs > 1) for seed in self._spawn_seeds(self.n_envs)]
+        if self.n_envs == 1:
+            return DummyVecEnv(env_fns)
+        return ShmemVecEnv(env_fns)
     
     def train(self, 
               total_timesteps: int = 100000,
@@ -94,45 +179,71 @@ class RehabRLTrainer:
         print(f"\n🚀 Training {self.algorithm} agent...")
         print(f"   Timesteps: {total_timesteps}")
         print(f"   Learning rate: {learning_rate}")
+        print(f"   Parallel environments: {self.n_envs}")
+        print(f"   Seed: {self.seed}")
         
         # Create environment
         env = self.create_env()
         
-        # Create evaluation environment
-        eval_env = self.create_env()
+        # Create evaluation environment (single env is enough)
+        eval_env = DummyVecEnv([self._make_env(self._spawn_seeds(1, EVAL_SEED_STREAM)[0])])
+        
+        device = 'cuda' if torch.cuda.is_available() else 'cpu'
+        print(f"   Device: {device}")
+        
+        # SB3 seeds random/numpy/torch and the action space from this, and
+        # reseeds the training envs with model_seed + rank on their first
+        # reset (still distinct per env, and still derived from --seed)
+        model_seed = self._spawn_seeds(1, MODEL_SEED_STREAM)[0]
         
         # Initialize agent
         if self.algorithm == 'DQN':
-            model = DQN(
+            # Prioritized replay samples high-TD-error transitions more often
+            dqn_kwargs = {'replay_buffer_class': FastReplayBuffer}
+            if self.prioritized_replay:
+                dqn_kwargs = {
+                    'replay_buffer_class': PrioritizedReplayBuffer,
+                    'replay_buffer_kwargs': {'alpha': 0.6, 'beta': 0.4}
+                }
+            dqn_class = PrioritizedDQN if self.prioritized_replay else DQN
+            
+            model = dqn_class(
                 "MlpPolicy",
                 env,
                 learning_rate=learning_rate,
-                buffer_size=50000,
+                buffer_size=200_000,
                 learning_starts=1000,
-                batch_size=64,
+                batch_size=256,
                 tau=0.005,
                 gamma=0.99,
-                train_freq=4,
+                # One gradient step per transition collected, whatever n_envs is
+                train_freq=(1, 'step'),
+                gradient_steps=self.n_envs,
                 target_update_interval=1000,
                 exploration_fraction=0.3,
                 exploration_initial_eps=1.0,
                 exploration_final_eps=0.05,
                 verbose=1,
-                tensorboard_log=str(self.output_dir / 'tensorboard')
+                tensorboard_log=str(self.output_dir / 'tensorboard'),
+                device=device,
+                seed=model_seed,
+                **dqn_kwargs
             )
         elif self.algorithm == 'PPO':
             model = PPO(
                 "MlpPolicy",
                 env,
                 learning_rate=learning_rate,
-                n_steps=2048,
+                n_steps=2048 // self.n_envs,  # same rollout size across envs
                 batch_size=64,
                 n_epochs=10,
                 gamma=0.99,
                 gae_lambda=0.95,
                 clip_range=0.2,
                 verbose=1,
-                tensorboard_log=str(self.output_dir / 'tensorboard')
+                tensorboard_log=str(self.output_dir / 'tensorboard'),
+                device=device,
+                seed=model_seed
             )
         else:
             raise ValueError(f"Unknown algorithm: {self.algorithm}")
@@ -144,11 +255,15 @@ class RehabRLTrainer:
             eval_env,
             best_model_save_path=str(self.output_dir / 'best_model'),
             log_path=str(self.output_dir / 'eval_logs'),
-            eval_freq=5000,
+            eval_freq=max(5000 // self.n_envs, 1),  # counted in vectorized steps
             deterministic=True,
             render=False
         )
         
+        # Leave intra-op threads to the learner, sharing cores with the env workers
+        if self.n_envs > 1:
+            torch.set_num_threads(max(1, (os.cpu_count() or 2) // 2))
+        
         # Train
         model.learn(
             total_timesteps=total_timesteps,
@@ -160,6 +275,10 @@ class RehabRLTrainer:
         model.save(str(model_path))
         print(f"\n✅ Model saved to: {model_path}")
         
+        # Stop the env workers and release their shared observation memory
+        env.close()
+        eval_env.close()
+        
         # Save training metrics
         self._save_training_metrics(training_callback)
         
@@ -167,9 +286,10 @@ class RehabRLTrainer:
     
     def _save_training_metrics(self, callback: RehabTrainingCallback):
         """Save training metrics and plot"""
+        # The callback already stores plain Python floats / ints
         metrics = {
-            'episode_rewards': [float(r) for r in callback.episode_rewards],
-            'episode_lengths': [float(l) for l in callback.episode_lengths]
+            'episode_rewards': list(callback.episode_rewards),
+            'episode_lengths': list(callback.episode_lengths)
         }
         
         # Save to JSON
@@ -178,15 +298,24 @@ class RehabRLTrainer:
             json.dump(metrics, f, indent=2)
         
         # Plot rewards
+        rewards = np.asarray(callback.episode_rewards, dtype=np.float32)
+        lengths = np.asarray(callback.episode_lengths)
+        episodes = np.arange(len(rewards))
+        
+        # Plot at most ~5000 points per line; the moving average is computed
+        # on the full series first, so it keeps the smoothed detail
+        step = max(len(rewards) // 5000, 1)
+        
         plt.figure(figsize=(12, 5))
         
         plt.subplot(1, 2, 1)
-        plt.plot(callback.episode_rewards, alpha=0.3)
+        plt.plot(episodes[::step], rewards[::step], alpha=0.3)
         
         # Moving average
-        if len(callback.episode_rewards) > 100:
-            moving_avg = pd.Series(callback.episode_rewards).rolling(100).mean()
-            plt.plot(moving_avg, linewidth=2, label='100-episode average')
+        if len(rewards) > 100:
+            kernel = np.full(100, 1.0 / 100, dtype=np.float32)
+            moving_avg = np.convolve(rewards, kernel, mode='valid')
+            plt.plot(episodes[99::step], moving_avg[::step], linewidth=2, label='100-episode average')
         
         plt.xlabel('Episode')
         plt.ylabel('Total Reward')
@@ -195,7 +324,7 @@ class RehabRLTrainer:
         plt.grid(True, alpha=0.3)
         
         plt.subplot(1, 2, 2)
-        plt.plot(callback.episode_lengths)
+        plt.plot(episodes[::step], lengths[::step])
         plt.xlabel('Episode')
         plt.ylabel('Episode Length')
         plt.title('Episode Lengths')
@@ -204,58 +333,128 @@ class RehabRLTrainer:
         plt.tight_layout()
         plot_path = self.output_dir / 'training_plot.png'
         plt.savefig(plot_path, dpi=150)
+        plt.close()
         print(f"📊 Training plot saved to: {plot_path}")
     
-    def evaluate(self, model_path: str, n_episodes: int = 100):
-        """Evaluate trained model"""
-        print(f"\n📊 Evaluating model: {model_path}")
+    def _policy_network(self, model) -> nn.Module:
+        """
+        Plain nn.Module mapping a batch of observations to action scores
         
-        # Load model
+        Q-values for DQN, action logits for PPO; the greedy action is the
+        argmax either way. Both use SB3's default flatten features extractor.
+        """
         if self.algorithm == 'DQN':
-            model = DQN.load(model_path)
-        elif self.algorithm == 'PPO':
-            model = PPO.load(model_path)
-        
-        # Create environment
-        env = self.create_env()
+            net = nn.Sequential(nn.Flatten(), model.policy.q_net.q_net)
+        else:
+            policy = model.policy
+            net = nn.Sequential(nn.Flatten(), policy.mlp_extractor.policy_net, policy.action_net)
+        return net.eval()
+    
+    def evaluate(self, model_path: str, n_episodes: int = 100, onnx_path: str = None):
+        """
+        Evaluate trained model
         
-        # Evaluate
-        episode_rewards = []
-        episode_infos = []
+        If onnx_path (from export_for_deployment) is given and onnxruntime is
+        installed, the policy runs in ONNX Runtime instead of TorchScript.
+        """
+        print(f"\n📊 Evaluating model: {model_path}")
         
-        for ep in range(n_episodes):
-            state, _ = env.reset()  # Gymnasium API returns (obs, info)
-            done = False
-            total_reward = 0
-            
-            while not done:
-                action, _ = model.predict(state, deterministic=True)
-                state, reward, terminated, truncated, info = env.step(action)  # Gymnasium API returns 5 values
-                done = terminated or truncated
-                total_reward += reward
+        sess = None
+        if onnx_path is not None and ort is not None:
+            sess = ort.InferenceSession(str(onnx_path), providers=['CPUExecutionProvider'])
+            print(f"   Policy runtime: ONNX Runtime ({onnx_path})")
+        else:
+            if onnx_path is not None:
+                print(f"   ⚠️ onnxruntime not installed, ignoring {onnx_path}; evaluating with TorchScript")
+            # Load model
+            if self.algorithm == 'DQN':
+                model = DQN.load(model_path)
+            elif self.algorithm == 'PPO':
+                model = PPO.load(model_path)
+        
+        # Run episodes in parallel envs so each policy forward is one batch;
+        # the vec env resets finished envs automatically. Each env gets its
+        # own seed from the evaluation stream, so a deterministic policy
+        # doesn't replay one episode per worker (or a training episode)
+        n_envs = max(1, min(self.n_envs, n_episodes))
+        env_fns = [self._make_env(seed, subprocess=n_envs > 1) for seed in self._spawn_seeds(n_envs, EVAL_SEED_STREAM)]
+        env = ShmemVecEnv(env_fns) if n_envs > 1 else DummyVecEnv(env_fns)
+        
+        # Spread the episodes evenly so short episodes aren't over-represented
+        episodes_left = np.full(n_envs, n_episodes // n_envs)
+        episodes_left[:n_episodes % n_envs] += 1
+        
+        # One observation buffer reused every step (numpy view shares its memory)
+        obs_buf = torch.empty((n_envs, env.observation_space.shape[0]), dtype=torch.float32)
+        obs_np = obs_buf.numpy()
+        
+        if sess is None:
+            # Trace the greedy policy once for the fixed (n_envs, obs_dim) batch
+            # and freeze it (weights inlined as constants); calling it directly
+            # skips SB3's per-call predict() wrapper
+            with torch.no_grad():
+                traced = torch.jit.trace(self._policy_network(model), torch.zeros_like(obs_buf))
+            policy_net = torch.jit.optimize_for_inference(torch.jit.freeze(traced))
+        
+        # Evaluate, aggregating episode rewards as they finish (Welford's
+        # running mean / sum of squared deviations) instead of storing them
+        reward_count = 0
+        reward_mean = 0.0
+        reward_m2 = 0.0
+        reward_min = float('inf')
+        reward_max = float('-inf')
+        term_counter = Counter()
+        total_reward = np.zeros(n_envs)
+        
+        obs_np[:] = env.reset()
+        while episodes_left.any():
+            if sess is not None:
+                scores = sess.run(None, {'obs': obs_np})[0]
+            else:
+                with torch.no_grad():
+                    scores = policy_net(obs_buf).numpy()
+            # Plain ints: env.step compares the action against ints every step
+            actions = scores.argmax(1).tolist()
+            obs, rewards, dones, infos = env.step(actions)
+            obs_np[:] = obs
+            total_reward += rewards
             
-            episode_rewards.append(total_reward)
-            episode_infos.append(info)
-        
-        # Statistics
+            for i in np.flatnonzero(dones):
+                if episodes_left[i] > 0:
+                    episode_reward = float(total_reward[i])
+                    reward_count += 1
+                    delta = episode_reward - reward_mean
+                    reward_mean += delta / reward_count
+                    reward_m2 += delta * (episode_reward - reward_mean)
+                    reward_min = min(reward_min, episode_reward)
+                    reward_max = max(reward_max, episode_reward)
+                    term_counter[infos[i].get('termination', 'unknown')] += 1
+                    episodes_left[i] -= 1
+                total_reward[i] = 0
+        
+        env.close()
+        
+        # Statistics (all zero if no episodes were requested)
+        if reward_count == 0:
+            reward_min = reward_max = 0.0
         results = {
-            'mean_reward': float(np.mean(episode_rewards)),
-            'std_reward': float(np.std(episode_rewards)),
-            'min_reward': float(np.min(episode_rewards)),
-            'max_reward': float(np.max(episode_rewards)),
+            'mean_reward': reward_mean,
+            'std_reward': (reward_m2 / reward_count) ** 0.5 if reward_count else 0.0,
+            'min_reward': reward_min,
+            'max_reward': reward_max,
             'termination_reasons': {
-                'session_complete': int(sum(1 for info in episode_infos if info.get('termination') == 'session_complete')),
-                'fatigue_quit': int(sum(1 for info in episode_infos if info.get('termination') == 'fatigue_quit')),
-                'frustration_quit': int(sum(1 for info in episode_infos if info.get('termination') == 'frustration_quit'))
+                'session_complete': term_counter['session_complete'],
+                'fatigue_quit': term_counter['fatigue_quit'],
+                'frustration_quit': term_counter['frustration_quit']
             }
         }
         
-        print(f"\n✅ Evaluation Results (n={n_episodes}):")
+        print(f"\n✅ Evaluation Results (n={reward_count}):")
         print(f"   Mean Reward: {results['mean_reward']:.2f} ± {results['std_reward']:.2f}")
         print(f"   Min/Max: {results['min_reward']:.2f} / {results['max_reward']:.2f}")
         print(f"   Termination Reasons:")
         for reason, count in results['termination_reasons'].items():
-            print(f"      {reason}: {count} ({count/n_episodes*100:.1f}%)")
+            print(f"      {reason}: {count} ({count/max(reward_count, 1)*100:.1f}%)")
         
         # Save results
         results_path = self.output_dir / 'evaluation_results.json'
@@ -264,8 +463,8 @@ class RehabRLTrainer:
         
         return results
     
-    def export_for_deployment(self, model_path: str):
-        """Export model for web deployment (TensorFlow.js)"""
+    def export_for_deployment(self, model_path: str) -> Path:
+        """Export the greedy policy network to ONNX for deployment / fast evaluation"""
         print(f"\n📦 Exporting model for deployment...")
         
         # Load model
@@ -275,21 +474,40 @@ class RehabRLTrainer:
             model = PPO.load(model_path)
         
         # Extract policy network
-        policy = model.policy
+        net = self._policy_network(model)
         
         # Save policy separately
         policy_path = self.output_dir / 'policy_network'
         policy_path.mkdir(exist_ok=True)
-        
-        # TODO: Convert to ONNX or TensorFlow.js format
-        # This requires additional libraries:
-        # pip install onnx onnxruntime tensorflowjs
-        
-        print(f"⚠️  Manual conversion required:")
-        print(f"   1. Install: pip install onnx tensorflowjs")
-        print(f"   2. Convert policy to ONNX")
-        print(f"   3. Convert ONNX to TensorFlow.js")
-        print(f"   4. Deploy to demo/models/")
+        onnx_path = policy_path / 'policy.onnx'
+        
+        dummy = torch.zeros((1, model.observation_space.shape[0]), dtype=torch.float32)
+        torch.onnx.export(
+            net, dummy, str(onnx_path),
+            input_names=['obs'],
+            output_names=['q'],
+            opset_version=17,
+            dynamic_axes={'obs': {0: 'batch'}, 'q': {0: 'batch'}}
+        )
+        print(f"✅ ONNX policy saved to: {onnx_path}")
+        
+        # int8 weights for CPU / edge inference (dynamic quantization of the Linear layers)
+        qnet = torch.quantization.quantize_dynamic(net, {nn.Linear}, dtype=torch.qint8)
+        int8_path = policy_path / 'policy_int8.pt'
+        torch.jit.save(torch.jit.script(qnet), str(int8_path))
+        print(f"✅ int8 TorchScript policy saved to: {int8_path}")
+        
+        # torch.onnx can't export dynamically quantized Linears, so quantize
+        # the exported graph with ONNX Runtime's tooling instead
+        if ort is not None:
+            from onnxruntime.quantization import quantize_dynamic, QuantType
+            int8_onnx_path = policy_path / 'policy_int8.onnx'
+            quantize_dynamic(str(onnx_path), str(int8_onnx_path), weight_type=QuantType.QInt8)
+            print(f"✅ int8 ONNX policy saved to: {int8_onnx_path}")
+        print(f"   Evaluate with: --mode eval --onnx {onnx_path}")
+        print(f"   For the web demo, convert ONNX to TensorFlow.js and deploy to demo/models/")
+        
+        return onnx_path
 
 
 if __name__ == '__main__':
@@ -300,16 +518,24 @@ if __name__ == '__main__':
                         help='RL algorithm to use')
     parser.add_argument('--timesteps', type=int, default=100000,
                         help='Total training timesteps')
+    parser.add_argument('--num-envs', type=int, default=8,
+                        help='Number of parallel training environments')
+    parser.add_argument('--per', action=argparse.BooleanOptionalAction, default=True,
+                        help='Prioritized experience replay for DQN (--no-per for uniform replay)')
+    parser.add_argument('--seed', type=int, default=None,
+                        help='Seed for the envs and the model (default: drawn from OS entropy)')
     parser.add_argument('--lr', type=float, default=1e-4,
                         help='Learning rate')
     parser.add_argument('--data', type=str, default=None,
                         help='Path to processed user data CSV')
     parser.add_argument('--output', type=str, default='./models',
                         help='Output directory for models')
-    parser.add_argument('--mode', type=str, default='train', choices=['train', 'eval'],
-                        help='Train or evaluate mode')
+    parser.add_argument('--mode', type=str, default='train', choices=['train', 'eval', 'export'],
+                        help='Train, evaluate or export (ONNX) mode')
     parser.add_argument('--model', type=str, default=None,
-                        help='Path to model for evaluation')
+                        help='Path to model for evaluation / export')
+    parser.add_argument('--onnx', type=str, default=None,
+                        help='Evaluate with this exported ONNX policy (requires onnxruntime)')
     
     args = parser.parse_args()
     
@@ -317,7 +543,10 @@ if __name__ == '__main__':
     trainer = RehabRLTrainer(
         data_path=args.data,
         algorithm=args.algorithm,
-        output_dir=args.output
+        output_dir=args.output,
+        n_envs=args.num_envs,
+        seed=args.seed,
+        prioritized_replay=args.per
     )
     
     if args.mode == 'train':
@@ -335,4 +564,10 @@ if __name__ == '__main__':
             print("❌ Error: --model required for evaluation")
         else:
             # Evaluate model
-            trainer.evaluate(args.model, n_episodes=100)
+            trainer.evaluate(args.model, n_episodes=100, onnx_path=args.onnx)
+        
+    elif args.mode == 'export':
+        if not args.model:
+            print("❌ Error: --model required for export")
+        else:
+            trainer.export_for_deployment(args.model)